@@ -0,0 +1,25 @@
+(function() {
+    const isMobile = window.innerWidth <= 768 || 
+        /Android|webOS|iPhone|iPad|iPod|BlackBerry|IEMobile|Opera Mini/i.test(navigator.userAgent);
+
+    // Add class to body for CSS targeting
+    if (isMobile) {
+        document.body.classList.add('mobile-view');
+    } else {
+        document.body.classList.remove('mobile-view');
+    }
+
+    // Store in sessionStorage for persistence
+    sessionStorage.setItem('is_mobile', isMobile ? 'true' : 'false');
+
+    // Update on resize
+    window.addEventListener('resize', function() {
+        const nowMobile = window.innerWidth <= 768;
+        if (nowMobile) {
+            document.body.classList.add('mobile-view');
+        } else {
+            document.body.classList.remove('mobile-view');
+        }
+        sessionStorage.setItem('is_mobile', nowMobile ? 'true' : 'false');
+    });
+})();
@@ -0,0 +1,89 @@
+"""Per-turn prompt size and latency across long sessions, full vs windowed history.
+
+Simulates visitors asking 50 questions in a row. Offline (default) it reports
+the history tokens each turn would send and the local cost of building the
+request. With ``--live`` (needs GOOGLE_API_KEY) it also times real Gemini
+calls per turn, which is where the flat curve shows up as flat latency.
+
+    python -m benchmarks.bench_history_window --turns 50 --sessions 5
+    python -m benchmarks.bench_history_window --turns 50 --sessions 1 --live
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from google.genai import types
+
+from core import history
+
+QUESTION = "How do you think about {} when the team is under pressure and the stakes are high?"
+TOPICS = ["hiring", "culture", "risk", "feedback", "strategy", "client trust", "AI adoption", "failure"]
+REPLY_SENTENCE = "In my experience, the leaders who do this well are explicit about trade-offs and consistent about follow-through."
+
+
+def _full_contents(conversation: list, user_message: str) -> list[types.Content]:
+    contents = [
+        types.Content(role="model" if m["role"] == "assistant" else "user",
+                      parts=[types.Part.from_text(text=m["content"])])
+        for m in conversation
+    ]
+    contents.append(types.Content(role="user", parts=[types.Part.from_text(text=user_message)]))
+    return contents
+
+
+def _tokens(contents: list[types.Content]) -> int:
+    return sum(history.estimate_tokens(p.text) for c in contents for p in c.parts)
+
+
+def _session(turns: int, rng: random.Random, live: bool) -> dict[str, list[list[float]]]:
+    rows = {k: [] for k in ("full_tokens", "window_tokens", "full_build_ms", "window_build_ms", "live_s")}
+    conversation: list = []
+    for _ in range(turns):
+        question = QUESTION.format(rng.choice(TOPICS))
+
+        start = time.perf_counter()
+        full = _full_contents(conversation, question)
+        rows["full_build_ms"].append((time.perf_counter() - start) * 1000)
+        start = time.perf_counter()
+        windowed = history.build_contents(conversation, question)
+        rows["window_build_ms"].append((time.perf_counter() - start) * 1000)
+        rows["full_tokens"].append(_tokens(full))
+        rows["window_tokens"].append(_tokens(windowed))
+
+        if live:
+            from core.llm_client import get_leader_response
+            start = time.perf_counter()
+            reply = get_leader_response("You are a thoughtful business leader. Answer in 4-6 sentences.",
+                                        conversation, question)
+            rows["live_s"].append(time.perf_counter() - start)
+        else:
+            reply = " ".join([REPLY_SENTENCE] * rng.randint(4, 8))
+        conversation += [{"role": "user", "content": question}, {"role": "assistant", "content": reply}]
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=50)
+    parser.add_argument("--sessions", type=int, default=5)
+    parser.add_argument("--live", action="store_true", help="time real Gemini calls (windowed history)")
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    sessions = [_session(args.turns, rng, args.live) for _ in range(args.sessions)]
+
+    def at(key: str, turn: int) -> float:
+        return statistics.mean(s[key][turn] for s in sessions)
+
+    header = f"{'turn':>5} {'full tok':>9} {'window tok':>11} {'full ms':>8} {'window ms':>10}"
+    print(header + (f" {'live s':>7}" if args.live else ""))
+    for turn in sorted({0, *range(4, args.turns, 5), args.turns - 1}):
+        line = (f"{turn + 1:>5} {at('full_tokens', turn):>9.0f} {at('window_tokens', turn):>11.0f} "
+                f"{at('full_build_ms', turn):>8.3f} {at('window_build_ms', turn):>10.3f}")
+        print(line + (f" {at('live_s', turn):>7.2f}" if args.live else ""))
+
+
+if __name__ == "__main__":
+    main()
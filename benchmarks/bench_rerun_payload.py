@@ -0,0 +1,46 @@
+"""Bytes the global CSS/JS cost the browser per Streamlit rerun.
+
+Before: the whole stylesheet and the mobile-detection script were sent as
+``st.markdown`` payloads on every rerun. After, with the media server on: the
+browser fetches both once (cached under their content hash) and each rerun
+ships only the injector. After, by default (media server off): the first run
+of the session inlines both and later reruns ship only the version check.
+
+    python -m benchmarks.bench_rerun_payload --reruns 50
+"""
+
+import argparse
+
+from components.global_assets import CSS_PATH, JS_PATH, build_injector_html, load_asset
+
+SAMPLE_URL = "http://localhost:8502/media/" + "0" * 32
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reruns", type=int, default=50)
+    args = parser.parse_args()
+
+    css, css_hash = load_asset(CSS_PATH)
+    js, js_hash = load_asset(JS_PATH)
+    legacy = len(f"<style>\n{css}</style>".encode()) + len(f"<script>\n{js}</script>".encode())
+
+    version = f"{css_hash}-{js_hash}"
+    injector = len(build_injector_html(
+        version, css_href=SAMPLE_URL + ".css", js_href=SAMPLE_URL + ".js"
+    ).encode())
+    first_load = len(css.encode()) + len(js.encode())  # fetched once, then browser-cached
+    inline_first = len(build_injector_html(version, css_text=css, js_text=js).encode())
+    check = len(build_injector_html(version).encode())
+
+    before = legacy * args.reruns
+    served = injector * args.reruns + first_load
+    inline = inline_first + check * (args.reruns - 1)
+    print(f"per rerun    before {legacy:>8,} B   media server {injector:>8,} B   "
+          f"inline (default) {inline_first:,} B once, then {check:,} B")
+    print(f"{args.reruns} reruns    before {before:>8,} B   media server {served:>8,} B "
+          f"({before / served:.1f}x less)   inline {inline:>8,} B ({before / inline:.1f}x less)")
+
+
+if __name__ == "__main__":
+    main()
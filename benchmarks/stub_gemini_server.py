@@ -0,0 +1,170 @@
+"""Local stand-in for the Gemini REST API, for exercising context caching offline.
+
+Implements just enough of v1beta for llm_client: cachedContents
+create/update/delete and generateContent / streamGenerateContent. Replies
+echo whether the request used a cached prompt or an inline one.
+
+    python -m benchmarks.stub_gemini_server --port 8765
+    GEMINI_BASE_URL=http://127.0.0.1:8765 GOOGLE_API_KEY=stub streamlit run app.py
+
+``--check`` starts the stub in-process and runs llm_client against it:
+first call creates the cache, later calls reuse it, a cache near its TTL is
+extended with ``caches.update``, a rate-limited call is raised without
+touching the cache, and a cache deleted server-side falls back to the
+inline prompt and is then re-created.
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+import uuid
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+caches: dict[str, dict] = {}
+calls: Counter = Counter()
+fail_next: list[int] = []  # statuses to answer the next generate calls with
+
+
+def _reply(text: str) -> dict:
+    return {
+        "candidates": [{"content": {"role": "model", "parts": [{"text": text}]}, "finishReason": "STOP"}],
+        "usageMetadata": {"promptTokenCount": 10, "candidatesTokenCount": 5, "totalTokenCount": 15},
+    }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, fmt, *args):
+        pass
+
+    def _json(self, status: int, body: dict) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _error(self, status: int, message: str) -> None:
+        reason = {404: "NOT_FOUND", 429: "RESOURCE_EXHAUSTED"}.get(status, "INTERNAL")
+        self._json(status, {"error": {"code": status, "message": message, "status": reason}})
+
+    def _body(self) -> dict:
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def do_POST(self):
+        path = self.path.split("?", 1)[0]
+        body = self._body()
+        if path.endswith("/cachedContents"):
+            name = f"cachedContents/{uuid.uuid4().hex[:12]}"
+            caches[name] = {"name": name, "model": body.get("model"), "ttl": body.get("ttl")}
+            calls["cache_create"] += 1
+            self._json(200, caches[name])
+            return
+        if ":generateContent" in path or ":streamGenerateContent" in path:
+            cached = body.get("cachedContent")
+            if fail_next:
+                status = fail_next.pop(0)
+                calls[f"status_{status}"] += 1
+                self._error(status, "injected failure")
+                return
+            if cached and cached not in caches:
+                calls["rejected"] += 1
+                self._error(404, f"{cached} not found")
+                return
+            calls["cached" if cached else "inline"] += 1
+            question = body["contents"][-1]["parts"][0]["text"]
+            text = f"({'cached' if cached else 'inline'} prompt) You asked: {question}"
+            if ":generateContent" in path:
+                self._json(200, _reply(text))
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.end_headers()
+            for word in text.split(" "):
+                self.wfile.write(f"data: {json.dumps(_reply(word + ' '))}\r\n\r\n".encode())
+                self.wfile.flush()
+            return
+        self._error(404, path)
+
+    def do_PATCH(self):
+        name = self.path.split("?", 1)[0].split("/v1beta/", 1)[-1]
+        body = self._body()
+        if name not in caches:
+            self._error(404, f"{name} not found")
+            return
+        caches[name]["ttl"] = body.get("ttl")
+        calls["cache_update"] += 1
+        self._json(200, caches[name])
+
+    def do_DELETE(self):
+        caches.pop(self.path.split("?", 1)[0].split("/v1beta/", 1)[-1], None)
+        self._json(200, {})
+
+
+def serve(port: int) -> ThreadingHTTPServer:
+    httpd = ThreadingHTTPServer(("127.0.0.1", port), _Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return httpd
+
+
+def check() -> None:
+    httpd = serve(0)
+    os.environ["GEMINI_BASE_URL"] = f"http://127.0.0.1:{httpd.server_port}"
+    os.environ.setdefault("GOOGLE_API_KEY", "stub")
+    from core import context_cache, llm_client
+
+    prompt = "You are a leader. " * 400  # comfortably above the caching minimum
+    for i in range(3):
+        print("blocking:", llm_client.get_leader_response(prompt, [], f"question {i}"))
+    print("stream:  ", "".join(llm_client.stream_leader_response(prompt, [], "streamed question")))
+    assert calls["cache_create"] == 1 and calls["cached"] == 4 and calls["inline"] == 0, calls
+
+    for entry in context_cache._entries.values():  # close to the TTL: extend, don't re-create
+        entry.expires_at = time.time() + 60
+    print("refresh: ", llm_client.get_leader_response(prompt, [], "near expiry"))
+    assert calls["cache_update"] == 1 and calls["cache_create"] == 1 and calls["cached"] == 5, calls
+
+    fail_next.append(429)  # rate limited: raised, cache kept, no inline retry
+    try:
+        llm_client.get_leader_response(prompt, [], "rate limited")
+        raise AssertionError("429 was swallowed")
+    except llm_client.errors.APIError as exc:
+        print("429:     ", exc.code)
+    assert calls["inline"] == 0 and context_cache.cache_stats().get("invalidated", 0) == 0, calls
+    print("after:   ", llm_client.get_leader_response(prompt, [], "after the 429"))
+    assert calls["cached"] == 6 and calls["cache_create"] == 1, calls
+
+    caches.clear()  # the cache expired or was deleted server-side
+    print("expired: ", llm_client.get_leader_response(prompt, [], "after expiry"))
+    print("again:   ", llm_client.get_leader_response(prompt, [], "next visitor"))
+    assert calls["rejected"] == 1 and calls["inline"] == 1 and calls["cache_create"] == 2, calls
+
+    print("short:   ", llm_client.get_leader_response("Short prompt.", [], "hi"))
+    assert calls["inline"] == 2, calls
+    print("OK", dict(calls), context_cache.cache_stats())
+    httpd.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--check", action="store_true", help="run llm_client against an in-process stub")
+    args = parser.parse_args()
+    if args.check:
+        check()
+        return
+    httpd = serve(args.port)
+    print(f"Stub Gemini API on http://127.0.0.1:{httpd.server_port}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        httpd.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,39 @@
 import json
 import streamlit as st
 import streamlit.components.v1 as components
-from utils.helpers import get_image_base64, hex_to_rgba
+from core import media_store
+from utils.helpers import hex_to_rgba
 
 
 def render_tts_dialogue(
     user_text: str,
     leader_text: str,
     leader_name: str = "Leader",
-    leader_audio_b64: str | None = None,
-    user_audio_b64: str | None = None,
+    leader_audio_src: str | None = None,
+    user_audio_src: str | None = None,
     has_video: bool = False,
+    turn_id: str | None = None,
+    elapsed_s: float = 0.0,
 ):
     """Single hidden component: speaks the user question, then leader response.
 
-    Both user and leader audio can be server-generated (Edge TTS / ElevenLabs).
-    Falls back to browser speechSynthesis only if no audio bytes are available.
+    Both user and leader audio can be server-generated (Edge TTS / ElevenLabs)
+    and are passed as media URLs (or data URIs when the media server is off).
+    A live-stream URL plays from its first chunk while the rest is still
+    arriving. Falls back to browser speechSynthesis only if no audio bytes are
+    available. With ``turn_id``, the time until the leader is first heard
+    (``elapsed_s`` of server time plus the browser's own delay) is reported.
     
     On mobile devices, always shows a play button since autoplay is blocked.
     """
     safe_user = json.dumps((user_text or "")[:400])
     safe_leader = json.dumps((leader_text or "")[:2000])
     use_video = "true" if has_video else "false"
-    has_user_audio = "true" if user_audio_b64 else "false"
-    has_leader_audio = "true" if leader_audio_b64 else "false"
+    has_user_audio = "true" if user_audio_src else "false"
+    has_leader_audio = "true" if leader_audio_src else "false"
+    user_src = json.dumps(user_audio_src or "")
+    leader_src = json.dumps(leader_audio_src or "")
+    ttfs_url = json.dumps((media_store.ttfs_url(turn_id) if turn_id else None) or "")
     
     js_logic = f"""
     <script>
@@ -45,7 +55,24 @@ def render_tts_dialogue(
         // Track active audio to prevent overlapping
         var currentAudio = null;
 
+        var loadedAt = performance.now();
+        var ttfsUrl = {ttfs_url};
+        function reportFirstSound() {{
+            if (!ttfsUrl) return;
+            var ms = {elapsed_s * 1000:.0f} + (performance.now() - loadedAt);
+            try {{ navigator.sendBeacon(ttfsUrl + '&ms=' + Math.round(ms)); }} catch (e) {{}}
+            ttfsUrl = "";
+        }}
+
+        function setLoop(on) {{
+            var loop = window.parent.document.getElementById('leader-loop');
+            if (!loop) return;
+            if (on) {{ loop.style.opacity = 1; loop.play().catch(function() {{}}); }}
+            else {{ loop.pause(); loop.style.opacity = 0; }}
+        }}
+
         function setSpeaking(el, speaking) {{
+            if (el && el === leaderEl) setLoop(speaking);
             if (!el) return;
             if (speaking) el.classList.add('speaking');
             else el.classList.remove('speaking');
@@ -107,7 +134,7 @@ def render_tts_dialogue(
 
         function playUser() {{
             if (hasUserAudio) {{
-                var userAudio = new Audio("data:audio/mpeg;base64,{user_audio_b64 or ''}");
+                var userAudio = new Audio({user_src});
                 currentAudio = userAudio;
                 userAudio.onplay = function() {{ setSpeaking(userEl, true); }};
                 userAudio.onended = function() {{
@@ -168,14 +195,16 @@ def render_tts_dialogue(
                     console.warn("Video play failed even after interaction", e);
                     setSpeaking(leaderEl, false);
                 }});
+                leaderVideo.onplaying = reportFirstSound;
                 leaderVideo.onended = function() {{ setSpeaking(leaderEl, false); }};
                 return;
             }}
 
-            var audioData = "{leader_audio_b64 or ''}";
-            if (audioData) {{
-                var audio = new Audio("data:audio/mpeg;base64," + audioData);
+            var audioSrc = {leader_src};
+            if (audioSrc) {{
+                var audio = new Audio(audioSrc);
                 currentAudio = audio;
+                audio.onplaying = reportFirstSound;
                 audio.onended = function() {{ 
                     setSpeaking(leaderEl, false); 
                     currentAudio = null;
@@ -208,14 +237,16 @@ def render_tts_dialogue(
                         showPlayButton(leaderEl, playLeaderWithInteraction, '🔊 Tap to Play Response');
                     }});
                 }}
+                leaderVideo.onplaying = reportFirstSound;
                 leaderVideo.onended = function() {{ setSpeaking(leaderEl, false); }};
                 return;
             }}
 
-            var audioData = "{leader_audio_b64 or ''}";
-            if (audioData) {{
-                var audio = new Audio("data:audio/mpeg;base64," + audioData);
+            var audioSrc = {leader_src};
+            if (audioSrc) {{
+                var audio = new Audio(audioSrc);
                 currentAudio = audio;
+                audio.onplaying = reportFirstSound;
                 audio.onended = function() {{ 
                     setSpeaking(leaderEl, false); 
                     currentAudio = null;
@@ -270,13 +301,253 @@ def render_tts_dialogue(
     components.html(js_logic, height=0)
 
 
+# Installed into the parent document (not the component iframe) so queued
+# audio keeps playing when Streamlit reruns and tears down the iframes.
+_AUDIO_QUEUE_JS = """
+window.exlAudioQueue = (function() {
+    var items = [], current = null, turn = null, blocked = false;
+    var leaderPlayed = 0;  // seconds of leader audio already finished this turn
+    var ttfsSent = false;
+    var clips = [];  // lip-sync clips of this turn in order: {src, start, dur} (seconds into the reply)
+
+    function wrapper(speaker) {
+        return document.getElementById(speaker === 'user' ? 'user-avatar-wrapper' : 'leader-avatar-wrapper');
+    }
+    // Generic talking loop (core.avatar_loops), shown while the leader speaks
+    // wherever no lip-sync clip covers the audio yet. Re-checked on timeupdate
+    // so a rerun that re-creates the element doesn't leave it paused.
+    function setLoop(on) {
+        var loop = document.getElementById('leader-loop');
+        if (!loop) return;
+        if (on) {
+            loop.style.opacity = 1;
+            if (loop.paused) loop.play().catch(function() {});
+        } else {
+            loop.pause();
+            loop.style.opacity = 0;
+        }
+    }
+    function setSpeaking(speaker, on) {
+        if (speaker === 'leader') setLoop(on);
+        var el = wrapper(speaker);
+        if (!el) return;
+        if (on) el.classList.add('speaking'); else el.classList.remove('speaking');
+    }
+    function removeButton() {
+        var btn = document.querySelector('.audio-queue-btn');
+        if (btn) btn.remove();
+    }
+    function reset() {
+        items = [];
+        blocked = false;
+        leaderPlayed = 0;
+        ttfsSent = false;
+        clips = [];
+        if (current) { current.audio.pause(); setSpeaking(current.speaker, false); current = null; }
+        removeButton();
+    }
+    function showButton(label, onTap) {
+        var el = wrapper('leader');
+        if (!el) return;
+        removeButton();
+        var btn = document.createElement('div');
+        btn.className = 'audio-queue-btn audio-retry-btn';
+        btn.innerHTML = label;
+        btn.style.cssText = 'position:absolute;bottom:20px;left:50%;transform:translateX(-50%);' +
+            'background:linear-gradient(135deg,#F26522,#E85D26);color:white;' +
+            'padding:12px 24px;border-radius:25px;font-size:14px;font-weight:600;' +
+            'cursor:pointer;z-index:100;box-shadow:0 4px 20px rgba(242,101,34,0.5);' +
+            'border:2px solid rgba(255,255,255,0.3);';
+        function handleTap(e) {
+            e.stopPropagation();
+            e.preventDefault();
+            btn.remove();
+            onTap();
+        }
+        btn.addEventListener('click', handleTap);
+        btn.addEventListener('touchend', handleTap);
+        if (getComputedStyle(el).position === 'static') el.style.position = 'relative';
+        el.appendChild(btn);
+    }
+    function leaderPosition() {
+        var pos = leaderPlayed;
+        if (current && current.speaker === 'leader') pos += current.audio.currentTime || 0;
+        return pos;
+    }
+    function clipList(video) {
+        return clips.length ? clips : [{src: video.getAttribute('src'), start: 0, dur: Infinity}];
+    }
+    // Index of the clip covering ``pos`` seconds of the reply, or -1 if it isn't rendered yet.
+    function clipAt(list, pos) {
+        for (var i = 0; i < list.length; i++) {
+            if (pos >= list[i].start && pos < list[i].start + (list[i].dur || Infinity)) return i;
+        }
+        return -1;
+    }
+    function showClip(video, list, i) {
+        video.style.visibility = i < 0 ? 'hidden' : 'visible';
+        if (i < 0) { video.pause(); return false; }
+        if (video.dataset.clip !== String(i)) {
+            video.dataset.clip = String(i);
+            if (video.getAttribute('src') !== list[i].src) video.src = list[i].src;
+        }
+        return true;
+    }
+    // Lock the (muted) lip-sync clip covering the current audio position to
+    // it, or offer a replay if the reply finished before the video arrived.
+    function syncVideo() {
+        var video = document.getElementById('leader-video');
+        if (!video) return;
+        var list = clipList(video);
+        if (current && current.speaker === 'leader') {
+            var pos = leaderPosition(), i = clipAt(list, pos);
+            video.muted = true;
+            video.onended = function() { if (current) syncVideo(); };
+            if (!showClip(video, list, i)) return;
+            try { video.currentTime = pos - list[i].start; } catch (e) {}
+            video.play().catch(function() {});
+        } else if (!current && !items.length && leaderPlayed > 0) {
+            video.pause();
+            showButton('▶ Replay', function() {
+                setSpeaking('leader', true);
+                video.muted = false;
+                (function play(i) {
+                    if (i >= list.length) { setSpeaking('leader', false); return; }
+                    showClip(video, list, i);
+                    video.currentTime = 0;
+                    video.onended = function() { play(i + 1); };
+                    video.play().catch(function() { setSpeaking('leader', false); });
+                })(0);
+            });
+        }
+    }
+    // Move to the next clip when the audio crosses a chunk boundary.
+    function followVideo() {
+        var video = document.getElementById('leader-video');
+        if (!video || !clips.length) return;
+        var i = clipAt(clips, leaderPosition());
+        if (String(i) !== (video.dataset.clip || '-1') || (i >= 0 && video.paused)) syncVideo();
+    }
+    // Time to first sound: server time until the segment was pushed plus the
+    // browser's wait until it is actually audible (live streams included).
+    function reportFirstSound(item) {
+        if (ttfsSent || !item.ttfs) return;
+        ttfsSent = true;
+        var ms = (item.elapsed || 0) * 1000 + (performance.now() - item.receivedAt);
+        try { navigator.sendBeacon(item.ttfs + '&ms=' + Math.round(ms)); } catch (e) {}
+    }
+    function next() {
+        if (current || blocked || !items.length) return;
+        var item = items.shift();
+        var audio = new Audio(item.src);
+        current = {audio: audio, speaker: item.speaker};
+        function done() {
+            if (!current || current.audio !== audio) return;
+            setSpeaking(item.speaker, false);
+            if (item.speaker === 'leader' && isFinite(audio.duration)) leaderPlayed += audio.duration;
+            current = null;
+            setTimeout(next, item.speaker === 'user' ? 350 : 0);
+        }
+        audio.onplay = function() {
+            setSpeaking(item.speaker, true);
+            if (item.speaker === 'leader') syncVideo();
+        };
+        audio.onplaying = function() {
+            if (item.speaker === 'leader') reportFirstSound(item);
+        };
+        audio.ontimeupdate = function() {
+            if (item.speaker === 'leader') { setLoop(true); followVideo(); }
+        };
+        audio.onended = done;
+        audio.onerror = done;
+        var p = audio.play();
+        if (p !== undefined) {
+            p.catch(function(e) {
+                console.warn('Queued audio autoplay blocked', e);
+                current = null;
+                items.unshift(item);
+                blocked = true;
+                showButton('🔊 Tap to Listen', function() { blocked = false; next(); });
+            });
+        }
+    }
+    return {
+        push: function(item) {
+            if (item.turn !== turn) { reset(); turn = item.turn; }
+            item.receivedAt = performance.now();
+            items.push(item);
+            next();
+        },
+        reset: reset,
+        setClips: function(list) { clips = list || []; },
+        syncVideo: syncVideo
+    };
+})();
+"""
+
+
+def _queue_script(call: str) -> str:
+    """Component body that installs the parent-window queue if needed, then runs ``call``."""
+    return f"""
+    <script>
+    (function(){{
+        var parentWin = window.parent;
+        if (!parentWin.exlAudioQueue) {{
+            var s = parentWin.document.createElement('script');
+            s.textContent = {json.dumps(_AUDIO_QUEUE_JS)};
+            parentWin.document.head.appendChild(s);
+        }}
+        var queue = parentWin.exlAudioQueue;
+        {call}
+    }})();
+    </script>
+    """
+
+
+def render_audio_segment(
+    audio_src: str,
+    turn_id: str,
+    speaker: str = "leader",
+    elapsed_s: float = 0.0,
+):
+    """Queue one audio segment for in-order playback as soon as it's rendered.
+
+    Segments with the same ``turn_id`` play back-to-back; a new turn id
+    stops whatever is still playing from the previous turn. ``audio_src``
+    may be a live stream, which starts playing from its first chunk.
+    ``elapsed_s`` is the server time since the turn started; the browser adds
+    its own delay and reports the turn's time to first leader sound.
+    """
+    item = json.dumps({
+        "turn": turn_id,
+        "speaker": speaker,
+        "src": audio_src,
+        "elapsed": round(elapsed_s, 3),
+        "ttfs": media_store.ttfs_url(turn_id),
+    })
+    components.html(_queue_script(f"queue.push({item});"), height=0)
+
+
+def render_video_sync(clips: list[dict] | None = None):
+    """Hand freshly arrived lip-sync video to the audio queue.
+
+    ``clips`` lists a chunked render's finished clips in order, each
+    ``{"src", "start", "dur"}`` in seconds of the reply; without it the
+    ``#leader-video`` source covers the whole reply.
+    """
+    components.html(
+        _queue_script(f"queue.setClips({json.dumps(clips or [])}); setTimeout(queue.syncVideo, 300);"),
+        height=0,
+    )
+
+
 def render_avatar_card(leader: dict) -> bool:
     accent = leader.get("accent_color", "#F26522")
     avatar_path = leader.get("avatar_image", "")
-    b64 = get_image_base64(avatar_path)
+    src = media_store.file_src(avatar_path, size=240)
 
-    if b64:
-        img_tag = f'<img src="data:image/png;base64,{b64}" style="width:100%;height:100%;object-fit:cover;object-position:center top;border-radius:50%;" />'
+    if src:
+        img_tag = f'<img src="{src}" style="width:100%;height:100%;object-fit:cover;object-position:center top;border-radius:50%;" />'
     else:
         img_tag = f'<span style="font-size:2.8rem;">{leader.get("emoji", "")}</span>'
 
@@ -325,10 +596,10 @@ def render_user_active_avatar(
     speak_text: str | None = None,
 ):
     accent = "#F26522"
-    b64 = get_image_base64(avatar_path) if avatar_path else ""
+    src = media_store.file_src(avatar_path, size=440)
     
-    if b64:
-        img_tag = f'<img src="data:image/png;base64,{b64}" style="width:100%;height:100%;object-fit:cover;object-position:center top;border-radius:50%;" />'
+    if src:
+        img_tag = f'<img src="{src}" style="width:100%;height:100%;object-fit:cover;object-position:center top;border-radius:50%;" />'
     else:
         img_tag = '<span style="font-size:3rem;">&#x1F464;</span>'
 
@@ -363,27 +634,42 @@ def render_active_avatar(
     is_speaking: bool = False, # Ignored, controlled by JS
     speak_text: str | None = None,
     video_url: str | None = None,
+    loops: dict | None = None,
 ):
+    """``loops`` holds the leader's idle/talking loop srcs (core.avatar_loops).
+
+    The talking loop sits muted over the idle image and the audio queue fades
+    it in while the leader speaks; lip-sync clips, once they arrive, play on
+    top of both.
+    """
     accent = leader.get("accent_color", "#F26522")
     avatar_img = leader.get("avatar_image", "")
-    b64 = get_image_base64(avatar_img)
+    loops = loops or {}
+    src = loops.get("idle") or media_store.file_src(avatar_img, size=440)
 
     glow = hex_to_rgba(accent, 0.35)
     glow2 = hex_to_rgba(accent, 0.15)
 
-    if video_url:
-        # Added id="leader-video" for JS targeting
+    if src:
         img_tag = (
-            f'<video id="leader-video" src="{video_url}" playsinline '
-            f'style="width:100%;height:100%;object-fit:cover;border-radius:50%;"></video>'
-        )
-    elif b64:
-        img_tag = (
-            f'<img src="data:image/png;base64,{b64}" '
+            f'<img src="{src}" '
             f'style="width:100%;height:100%;object-fit:cover;object-position:center top;border-radius:50%;" />'
         )
     else:
         img_tag = f'<span style="font-size:3rem;">{leader.get("emoji", "")}</span>'
+    layer = 'position:absolute;inset:0;width:100%;height:100%;object-fit:cover;border-radius:50%;'
+    overlays = ""
+    if src and loops.get("talking"):
+        overlays += (
+            f'<video id="leader-loop" src="{loops["talking"]}" muted loop playsinline preload="auto" '
+            f'style="{layer}opacity:0;transition:opacity 0.15s;"></video>'
+        )
+    if video_url:
+        # Added id="leader-video" for JS targeting. Chunked renders show one
+        # clip at a time and hide it where the next isn't ready yet.
+        overlays += f'<video id="leader-video" src="{video_url}" playsinline style="{layer}"></video>'
+    if overlays:
+        img_tag = f'<div style="position:relative;width:100%;height:100%;">{img_tag}{overlays}</div>'
 
     # Use max-width and responsive sizing for mobile
     html = (
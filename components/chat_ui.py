@@ -1,6 +1,17 @@
 import streamlit as st
+from functools import lru_cache
 from pathlib import Path
 
+# Exchanges (question + reply) shown before older ones collapse behind "show more".
+TRANSCRIPT_WINDOW = 6
+
+
+@lru_cache(maxsize=64)
+def _avatar(path: str | None) -> str | None:
+    """Avatar path if the file exists. Avatars are written before their path is
+    stored, so the check only needs to happen once per path."""
+    return path if path and Path(path).exists() else None
+
 
 def render_chat_message(
     role: str,
@@ -9,16 +20,46 @@ def render_chat_message(
     user_avatar_path: str | None = None,
 ):
     if role == "user":
-        avatar = user_avatar_path if user_avatar_path and Path(user_avatar_path).exists() else None
-        with st.chat_message("user", avatar=avatar):
+        with st.chat_message("user", avatar=_avatar(user_avatar_path)):
             st.markdown(content)
     else:
-        avatar_path = leader.get("avatar_image", "") if leader else None
-        avatar = avatar_path if avatar_path and Path(avatar_path).exists() else None
+        avatar = _avatar(leader.get("avatar_image", "")) if leader else None
         with st.chat_message("assistant", avatar=avatar):
             st.markdown(content)
 
 
+def render_transcript(
+    conversation: list,
+    leader: dict,
+    user_avatar_path: str | None = None,
+    window: int = TRANSCRIPT_WINDOW,
+) -> bool:
+    """Render the last ``window`` exchanges of the conversation.
+
+    Older messages are not sent to the browser at all; a "show more" button
+    stands in for them. Returns True when that button is clicked.
+    """
+    start = max(len(conversation) - 2 * window, 0)
+    if conversation[start:start + 1] and conversation[start]["role"] == "assistant":
+        start -= 1  # never open the window on a reply without its question
+    start = max(start, 0)
+    clicked = False
+    if start:
+        clicked = st.button(
+            f"Show earlier messages ({start})",
+            key="transcript_show_more",
+            use_container_width=True,
+        )
+    for msg in conversation[start:]:
+        render_chat_message(
+            msg["role"],
+            msg["content"],
+            leader=leader if msg["role"] == "assistant" else None,
+            user_avatar_path=user_avatar_path,
+        )
+    return clicked
+
+
 def render_welcome_message(leader: dict, user_name: str = ""):
     accent = leader.get("accent_color", "#F26522")
     greeting = f"Welcome, {user_name}!" if user_name and user_name != "You" else "Welcome."
@@ -0,0 +1,88 @@
+import hashlib
+import json
+from functools import lru_cache
+from pathlib import Path
+
+import streamlit as st
+import streamlit.components.v1 as components
+
+from core import media_store
+
+CSS_PATH = Path("assets/ui/app.css")
+JS_PATH = Path("assets/ui/mobile_detection.js")
+
+
+@lru_cache(maxsize=8)
+def _read_asset(path: str, mtime_ns: int) -> tuple[str, str]:
+    text = Path(path).read_text(encoding="utf-8")
+    return text, hashlib.sha256(text.encode("utf-8")).hexdigest()[:12]
+
+
+def load_asset(path: Path) -> tuple[str, str]:
+    """(text, content hash) of a static asset, re-read only when it changes."""
+    return _read_asset(str(path), path.stat().st_mtime_ns)
+
+
+def build_injector_html(
+    version: str,
+    css_href: str | None = None,
+    js_href: str | None = None,
+    css_text: str | None = None,
+    js_text: str | None = None,
+) -> str:
+    """Idempotent script that adds the stylesheet and page script to the
+    parent document unless this version is already there.
+
+    Assets are referenced by URL when given, otherwise inlined. With neither,
+    the script only checks the version (the inline body was sent earlier).
+    """
+    css_attrs = {"rel": "stylesheet", "href": css_href} if css_href else (
+        {"textContent": css_text} if css_text is not None else None
+    )
+    js_attrs = {"src": js_href} if js_href else ({"text": js_text} if js_text is not None else None)
+    return f"""
+    <script>
+    (function(){{
+        var doc = window.parent.document;
+        var version = {json.dumps(version)};
+        function ensure(id, tag, attrs) {{
+            var el = doc.getElementById(id);
+            if (el && el.dataset.version === version) return;
+            if (!attrs) return;
+            if (el) el.remove();
+            el = doc.createElement(tag);
+            for (var k in attrs) el[k] = attrs[k];
+            el.id = id;
+            el.dataset.version = version;
+            doc.head.appendChild(el);
+        }}
+        ensure('exl-global-css', {json.dumps("link" if css_href else "style")}, {json.dumps(css_attrs)});
+        ensure('exl-global-js', 'script', {json.dumps(js_attrs)});
+    }})();
+    </script>
+    """
+
+
+def inject_global_assets():
+    """Load the global stylesheet and page script from versioned, cacheable URLs.
+
+    The CSS and JS are added to the page once per browser session and cached
+    by the browser under their content hash; each rerun only ships the small
+    version check above. Without the media server they are inlined, on the
+    first run of the session (or after an asset changes) only.
+    """
+    css, css_hash = load_asset(CSS_PATH)
+    js, js_hash = load_asset(JS_PATH)
+    version = f"{css_hash}-{js_hash}"
+    if media_store.ensure_server():
+        html = build_injector_html(
+            version,
+            css_href=media_store.file_src(str(CSS_PATH)),
+            js_href=media_store.file_src(str(JS_PATH)),
+        )
+    elif st.session_state.get("global_assets_inlined") != version:
+        html = build_injector_html(version, css_text=css, js_text=js)
+        st.session_state.global_assets_inlined = version
+    else:
+        html = build_injector_html(version)
+    components.html(html, height=0)
@@ -0,0 +1,181 @@
+"""Content-addressed on-disk cache for synthesized speech.
+
+Entries are keyed by a hash of (provider, voice, voice settings, normalized
+text) and stored as one file per clip, so every Streamlit session — and every
+process on the same host — shares the same cache.
+
+  * Writes are atomic (temp file + ``os.replace``), so readers never see a
+    half-written MP3.
+  * A hit bumps the file's mtime; when the directory grows past the size cap
+    the least-recently-used files are evicted first. The directory size is
+    kept as a running total, so writes don't scan it; it is re-scanned only
+    to evict, and every ``RESCAN_WRITES`` writes to pick up other processes.
+
+Environment:
+  TTS_CACHE_DIR     cache directory           (default assets/cache/tts)
+  TTS_CACHE_MAX_MB  size cap in megabytes     (default 500, 0 disables)
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+from pathlib import Path
+from typing import Callable
+
+from core import single_flight
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = Path(os.environ.get("TTS_CACHE_DIR", "assets/cache/tts"))
+MAX_BYTES = int(float(os.environ.get("TTS_CACHE_MAX_MB", "500")) * 1024 * 1024)
+SUFFIX = ".mp3"
+RESCAN_WRITES = 200
+EVICT_TO = 0.9  # evict down to this share of the cap, so a full cache isn't re-scanned on every write
+
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+_size = {"bytes": None, "writes_since_scan": 0}  # running total of the directory size
+
+
+def enabled() -> bool:
+    return MAX_BYTES > 0
+
+
+def normalize_text(text: str) -> str:
+    return re.sub(r"\s+", " ", (text or "")).strip()
+
+
+def cache_key(provider: str, voice: str, text: str, settings: dict | None = None) -> str:
+    """Stable hash of everything that changes the synthesized audio."""
+    payload = json.dumps(
+        {
+            "provider": provider,
+            "voice": voice,
+            "settings": settings or {},
+            "text": normalize_text(text),
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _path(key: str) -> Path:
+    return CACHE_DIR / f"{key}{SUFFIX}"
+
+
+def get(key: str) -> bytes | None:
+    if not enabled():
+        return None
+    path = _path(key)
+    try:
+        data = path.read_bytes()
+    except OSError:
+        with _lock:
+            _stats["misses"] += 1
+        return None
+    try:
+        os.utime(path)  # mark as recently used for LRU eviction
+    except OSError:
+        pass
+    with _lock:
+        _stats["hits"] += 1
+    return data or None
+
+
+def put(key: str, data: bytes) -> None:
+    if not enabled() or not data:
+        return
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        try:
+            replaced = _path(key).stat().st_size
+        except OSError:
+            replaced = 0
+        fd, tmp = tempfile.mkstemp(dir=CACHE_DIR, prefix=".tmp-", suffix=SUFFIX)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, _path(key))
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        with _lock:
+            _stats["writes"] += 1
+            _size["writes_since_scan"] += 1
+            rescan = _size["bytes"] is None or _size["writes_since_scan"] >= RESCAN_WRITES
+            if not rescan:
+                _size["bytes"] += len(data) - replaced
+            over = rescan or _size["bytes"] > MAX_BYTES
+        if over:
+            _evict()
+    except OSError as exc:
+        logger.warning("TTS cache write failed: %s", exc)
+
+
+def _evict() -> None:
+    """Re-scan the directory and drop least-recently-used clips until it fits under the cap."""
+    entries = []
+    total = 0
+    for p in CACHE_DIR.glob(f"*{SUFFIX}"):
+        if p.name.startswith(".tmp-"):
+            continue
+        try:
+            st = p.stat()
+        except OSError:
+            continue  # evicted concurrently by another session
+        entries.append((st.st_mtime, st.st_size, p))
+        total += st.st_size
+    if total > MAX_BYTES:
+        entries.sort()
+        for _, size, p in entries:
+            if total <= MAX_BYTES * EVICT_TO:
+                break
+            try:
+                p.unlink()
+            except OSError:
+                continue
+            total -= size
+            with _lock:
+                _stats["evictions"] += 1
+    with _lock:
+        _size["bytes"], _size["writes_since_scan"] = total, 0
+
+
+def cached_synthesize(
+    provider: str,
+    voice: str,
+    text: str,
+    settings: dict | None,
+    synthesize: Callable[[threading.Event], bytes | None],
+    cancel: threading.Event | None = None,
+) -> bytes | None:
+    """Return cached audio for the key, or call ``synthesize`` and store it.
+
+    Concurrent misses for the same key (several sessions voicing the same
+    sentence) share a single ``synthesize`` call. Setting ``cancel`` returns
+    None at once; ``synthesize`` gets an event that is only set when every
+    caller sharing it has cancelled.
+    """
+    key = cache_key(provider, voice, text, settings)
+    audio = get(key)
+    if audio:
+        logger.info("TTS cache hit: %s voice=%s", provider, voice)
+        return audio
+
+    def _miss(shared_cancel: threading.Event) -> bytes | None:
+        audio = synthesize(shared_cancel)
+        if audio:
+            put(key, audio)
+        return audio
+
+    return single_flight.do_cancellable(("tts", key), _miss, cancel)
+
+
+def cache_stats() -> dict:
+    with _lock:
+        return dict(_stats)
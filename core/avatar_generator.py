@@ -69,10 +69,10 @@ def _gemini_generate(photo_bytes: bytes) -> bytes | None:
         return None
 
     try:
-        from google import genai
         from google.genai import types
+        from core.genai_pool import get_client
 
-        client = genai.Client(api_key=api_key)
+        client = get_client(api_key)
 
         upload_image = types.Part.from_bytes(
             data=photo_bytes,
@@ -0,0 +1,250 @@
+"""Reusable idle and talking loop clips per leader.
+
+A real lip-sync render lands many seconds after the reply starts playing.
+Until then the leader avatar plays a generic clip instead of sitting still:
+
+  idle loop      an animated WebP of the avatar (slow breathing zoom and
+                 sway), built locally with Pillow, shown whenever the
+                 leader is silent;
+  talking loop   the leader's own voice reading a neutral passage, lip-synced
+                 once by the configured provider; played muted in step with
+                 the reply audio and swapped out when the real video lands.
+
+Clips are written (atomically) under ``assets/cache/avatar_loops/<id>/``
+together with a ``loops.json`` recording the avatar hash they were built
+from, so they are rebuilt only when the avatar changes. A lock file per
+leader keeps processes from building the same loops at once.
+
+The talking loop costs a paid TTS and lip-sync render, so it is only built
+ahead of an event by the CLI:
+
+    python -m core.avatar_loops            # missing or outdated loops only
+    python -m core.avatar_loops --force    # rebuild everything
+
+The app builds missing idle loops (free, local) in the background at
+startup. Loops are shown only while the media server is running; as data
+URIs they would be re-sent on every rerun.
+
+Environment:
+  AVATAR_LOOPS       0 disables the background builder and the loops in the UI (default 1)
+  AVATAR_LOOPS_DIR   where loops are stored              (default assets/cache/avatar_loops)
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import logging
+import math
+import os
+import tempfile
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+
+from PIL import Image
+
+from core import lipsync_jobs, media_store, response_bank, voice_client
+from core.personality_engine import load_all_leaders
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.environ.get("AVATAR_LOOPS", "1") != "0"
+LOOPS_DIR = Path(os.environ.get("AVATAR_LOOPS_DIR", "assets/cache/avatar_loops"))
+IDLE_NAME = "idle_loop.webp"
+TALKING_NAME = "talking_loop.mp4"
+MANIFEST_NAME = "loops.json"
+IDLE_SIZE = 440  # display size times 2 for high-density screens
+IDLE_FRAMES = 36
+IDLE_FPS = 12
+TALKING_SCRIPT = (
+    "That's a really good question, and it's one I think about often. "
+    "In my experience, the answer starts with people: listening first, "
+    "being honest about what we know, and staying curious about what we don't."
+)
+LOCK_STALE_S = 15 * 60
+
+_builder = {"started": False}
+_lock = threading.Lock()
+
+
+def _avatar_hash(avatar_path: str) -> str:
+    return hashlib.sha256(Path(avatar_path).read_bytes()).hexdigest()[:16]
+
+
+def _dir(leader_id: str) -> Path:
+    return LOOPS_DIR / leader_id
+
+
+def _read_manifest(directory: Path) -> dict:
+    try:
+        return json.loads((directory / MANIFEST_NAME).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def _write_manifest(directory: Path, manifest: dict) -> None:
+    _write_atomic(directory / MANIFEST_NAME, json.dumps(manifest, indent=1).encode("utf-8"))
+
+
+def _try_lock(directory: Path) -> int | None:
+    """O_EXCL lock file for one leader's build; None if another process holds it."""
+    path = directory / ".lock"
+    for _ in range(2):
+        try:
+            return os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                if time.time() - path.stat().st_mtime <= LOCK_STALE_S:
+                    return None
+            except OSError:
+                return None
+            path.unlink(missing_ok=True)  # left by a dead process
+    return None
+
+
+def build_idle(avatar_path: str, out: Path) -> None:
+    """Animated WebP: a few seconds of slow breathing and sway that loops seamlessly."""
+    base = Image.open(avatar_path).convert("RGB")
+    side = min(base.size)
+    base = base.crop(((base.width - side) // 2, 0, (base.width + side) // 2, side))
+    base = base.resize((IDLE_SIZE, IDLE_SIZE), Image.LANCZOS)
+    frames = []
+    for i in range(IDLE_FRAMES):
+        phase = 2 * math.pi * i / IDLE_FRAMES
+        scale = 1.02 + 0.012 * math.sin(phase)
+        size = int(IDLE_SIZE * scale)
+        frame = base.rotate(0.6 * math.sin(phase / 2 + 0.5), resample=Image.BICUBIC)
+        frame = frame.resize((size, size), Image.BICUBIC)
+        left = (size - IDLE_SIZE) // 2
+        top = (size - IDLE_SIZE) // 2 - int(3 * math.sin(phase))
+        top = min(max(top, 0), size - IDLE_SIZE)
+        frames.append(frame.crop((left, top, left + IDLE_SIZE, top + IDLE_SIZE)))
+    buf = io.BytesIO()
+    frames[0].save(
+        buf, format="WEBP", save_all=True, append_images=frames[1:],
+        duration=int(1000 / IDLE_FPS), loop=0, quality=70, method=4,
+    )
+    _write_atomic(out, buf.getvalue())
+
+
+def build_talking(leader: dict, out: Path) -> bool:
+    """Lip-sync the leader's voice reading a neutral passage. False if no TTS or provider."""
+    audio = voice_client.synthesize_for_leader(leader, TALKING_SCRIPT, hedge=False)
+    if not audio:
+        return False
+    video = response_bank.fetch_video(lipsync_jobs.render(audio, leader["avatar_image"]))
+    if not video:
+        return False
+    _write_atomic(out, video)
+    return True
+
+
+def build(leader: dict, force: bool = False, talking: bool = True) -> dict:
+    """Build whatever loops are missing or stale for this leader; returns the manifest.
+
+    ``talking=False`` builds only the idle loop (no paid calls). If another
+    process is building this leader's loops, returns the manifest as it is.
+    """
+    avatar = leader.get("avatar_image", "")
+    if not avatar or not Path(avatar).exists():
+        return {}
+    directory = _dir(leader["id"])
+    directory.mkdir(parents=True, exist_ok=True)
+    lock = _try_lock(directory)
+    if lock is None:
+        logger.info("Avatar loops for %s are being built by another process", leader["id"])
+        return _read_manifest(directory)
+    try:
+        digest = _avatar_hash(avatar)
+        manifest = _read_manifest(directory)
+        if force or manifest.get("avatar_sha") != digest:
+            manifest = {"avatar_sha": digest}
+
+        if "idle" not in manifest:
+            build_idle(avatar, directory / IDLE_NAME)
+            manifest["idle"] = IDLE_NAME
+            _write_manifest(directory, manifest)
+            logger.info("Idle loop built for %s", leader["id"])
+        if talking and "talking" not in manifest and lipsync_jobs.provider():
+            if build_talking(leader, directory / TALKING_NAME):
+                manifest["talking"] = TALKING_NAME
+                _write_manifest(directory, manifest)
+                logger.info("Talking loop built for %s", leader["id"])
+        return manifest
+    finally:
+        os.close(lock)
+        (directory / ".lock").unlink(missing_ok=True)
+
+
+@lru_cache(maxsize=32)
+def _current(leader_id: str, avatar_path: str, avatar_mtime: int, manifest_mtime: int) -> tuple[str, str]:
+    directory = _dir(leader_id)
+    manifest = _read_manifest(directory)
+    if manifest.get("avatar_sha") != _avatar_hash(avatar_path):
+        return "", ""
+    return tuple(
+        str(directory / manifest[kind]) if kind in manifest else "" for kind in ("idle", "talking")
+    )
+
+
+def loops_for(leader: dict) -> dict[str, str]:
+    """Browser ``src`` of the leader's idle and talking loops ("" where not built)."""
+    avatar = leader.get("avatar_image", "")
+    if not ENABLED or not avatar or not media_store.ensure_server():
+        return {"idle": "", "talking": ""}
+    try:
+        avatar_mtime = Path(avatar).stat().st_mtime_ns
+        manifest_mtime = (_dir(leader["id"]) / MANIFEST_NAME).stat().st_mtime_ns
+    except OSError:
+        return {"idle": "", "talking": ""}
+    idle, talking = _current(leader["id"], avatar, avatar_mtime, manifest_mtime)
+    return {"idle": media_store.file_src(idle), "talking": media_store.file_src(talking)}
+
+
+def start_builder(leaders: dict) -> None:
+    """Build missing idle loops in the background, once per process (talking loops: CLI only)."""
+    with _lock:
+        if not ENABLED or _builder["started"]:
+            return
+        _builder["started"] = True
+
+    def _run():
+        for leader in leaders.values():
+            try:
+                build(leader, talking=False)
+            except Exception as exc:
+                logger.warning("Avatar loops for %s failed: %s", leader.get("id"), exc)
+
+    threading.Thread(target=_run, name="avatar-loops", daemon=True).start()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--leaders", nargs="*", help="leader ids (default: all)")
+    parser.add_argument("--force", action="store_true", help="rebuild loops even if current")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    for leader_id, leader in load_all_leaders().items():
+        if args.leaders and leader_id not in args.leaders:
+            continue
+        manifest = build(leader, force=args.force)
+        built = [k for k in ("idle", "talking") if k in manifest]
+        logger.info("%s: %s", leader_id, ", ".join(built) or "no avatar image")
+
+
+if __name__ == "__main__":
+    main()
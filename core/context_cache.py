@@ -0,0 +1,126 @@
+"""Gemini context caching for leader system prompts.
+
+Each leader's system prompt is several kilobytes and identical for every
+visitor, yet was resent with every request. ``get_handle`` registers a prompt
+as Gemini cached content once and returns the handle name to pass as
+``cached_content`` until shortly before the TTL runs out, when it extends
+the TTL (or re-creates the entry if that fails).
+
+Whenever caching isn't possible — disabled, prompt below the API minimum,
+creation failed recently, or a handle was rejected — callers get None and
+send the prompt inline as before.
+
+Environment:
+  GEMINI_CONTEXT_CACHE      0 disables caching                     (default 1)
+  GEMINI_CACHE_TTL_S        lifetime of a cached prompt            (default 3600)
+  GEMINI_CACHE_MIN_TOKENS   don't cache shorter prompts            (default 1024)
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+
+from google import genai
+from google.genai import types
+
+from core import prompt_registry
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.environ.get("GEMINI_CONTEXT_CACHE", "1") != "0"
+TTL_S = int(os.environ.get("GEMINI_CACHE_TTL_S", "3600"))
+MIN_TOKENS = int(os.environ.get("GEMINI_CACHE_MIN_TOKENS", "1024"))
+REFRESH_MARGIN_S = 5 * 60
+RETRY_AFTER_S = 10 * 60
+
+
+@dataclass
+class _Entry:
+    name: str | None = None
+    expires_at: float = 0.0
+    failed_until: float = 0.0
+
+
+_lock = threading.Lock()
+_entries: dict[tuple[str, str], _Entry] = {}
+_key_locks: dict[tuple[str, str], threading.Lock] = {}
+_stats: Counter = Counter()
+
+
+def _key(model: str, system_prompt: str) -> tuple[str, str]:
+    return model, hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()[:16]
+
+
+def _create(client: genai.Client, model: str, system_prompt: str, digest: str) -> str:
+    cached = client.caches.create(
+        model=model,
+        config=types.CreateCachedContentConfig(
+            system_instruction=system_prompt,
+            ttl=f"{TTL_S}s",
+            display_name=f"leader-prompt-{digest}",
+        ),
+    )
+    _stats["created"] += 1
+    logger.info("Cached system prompt %s as %s", digest, cached.name)
+    return cached.name
+
+
+def get_handle(client: genai.Client, model: str, system_prompt: str) -> str | None:
+    """Cached-content name for this prompt, or None to send it inline."""
+    if not ENABLED or prompt_registry.token_count(system_prompt) < MIN_TOKENS:
+        return None
+    key = _key(model, system_prompt)
+    with _lock:
+        entry = _entries.setdefault(key, _Entry())
+        key_lock = _key_locks.setdefault(key, threading.Lock())
+
+    now = time.time()
+    if entry.name and now < entry.expires_at - REFRESH_MARGIN_S:
+        _stats["hits"] += 1
+        return entry.name
+    if now < entry.failed_until:
+        _stats["inline"] += 1
+        return None
+
+    with key_lock:  # one request per prompt talks to the API; the rest wait
+        now = time.time()
+        if entry.name and now < entry.expires_at - REFRESH_MARGIN_S:
+            _stats["hits"] += 1
+            return entry.name
+        try:
+            if entry.name and now < entry.expires_at:
+                try:
+                    client.caches.update(name=entry.name, config=types.UpdateCachedContentConfig(ttl=f"{TTL_S}s"))
+                    _stats["refreshed"] += 1
+                except Exception as exc:
+                    logger.info("Refreshing %s failed (%s); re-creating", entry.name, exc)
+                    entry.name = _create(client, model, system_prompt, key[1])
+            else:
+                entry.name = _create(client, model, system_prompt, key[1])
+            entry.expires_at = now + TTL_S
+            return entry.name
+        except Exception as exc:
+            logger.warning("Context caching unavailable, sending prompt inline: %s", exc)
+            entry.name = None
+            entry.failed_until = now + RETRY_AFTER_S
+            _stats["failed"] += 1
+            return None
+
+
+def invalidate(model: str, system_prompt: str) -> None:
+    """Forget a handle the API rejected (expired or deleted server-side)."""
+    with _lock:
+        entry = _entries.get(_key(model, system_prompt))
+    if entry:
+        entry.name = None
+        entry.expires_at = 0.0
+        _stats["invalidated"] += 1
+
+
+def cache_stats() -> dict[str, int]:
+    with _lock:
+        return {"prompts": sum(1 for e in _entries.values() if e.name), **_stats}
@@ -0,0 +1,256 @@
+"""Deadline-aware polling of D-ID talks.
+
+A talk renders in roughly a fixed setup time plus time proportional to the
+audio it lip-syncs. Instead of sleeping a fixed interval, each talk is left
+alone until shortly before its predicted completion, then polled with
+jittered exponential backoff. Predictions come from the audio duration and
+a model fitted to the render times seen so far.
+
+One scheduler thread serves every outstanding talk in the process. Polls are
+made from a few workers over the pooled D-ID session (core.http_sessions),
+so many waiting talks cost a handful of keep-alive connections and one
+request each when due.
+
+Each finished job records two metrics:
+  - the caller's wait;
+  - the overshoot: how long after D-ID finished the talk it was noticed.
+    This uses D-ID's completion timestamp when the response carries one,
+    else half the final poll interval.
+Both are added to core.latency_stats (``did.wait``, ``did.overshoot``);
+``poller_stats`` returns the model and recent jobs.
+
+Environment:
+  DID_POLL_MIN_S   shortest interval between polls of one talk (default 0.5)
+  DID_POLL_MAX_S   longest interval between polls of one talk  (default 5)
+"""
+
+import heapq
+import itertools
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from core import http_sessions, latency_stats
+
+logger = logging.getLogger(__name__)
+
+DID_API_URL = "https://api.d-id.com"
+POLL_MIN_S = float(os.environ.get("DID_POLL_MIN_S", "0.5"))
+POLL_MAX_S = float(os.environ.get("DID_POLL_MAX_S", "5"))
+BACKOFF_FACTOR = 1.6
+JITTER = 0.2
+EARLY_FRACTION = 0.85  # first poll at this share of the predicted render time
+SPEECH_CHARS_PER_S = 15.0  # for text-driven talks with no audio to measure
+
+_lock = threading.Condition()
+_heap: list[tuple[float, int, "_Job"]] = []
+_seq = itertools.count()
+_thread = {"started": False}
+_workers = ThreadPoolExecutor(max_workers=4, thread_name_prefix="did-poll")
+_recent: deque = deque(maxlen=100)
+
+
+class RenderModel:
+    """render_s ≈ overhead_s + ratio * audio_s, refined by least-mean-squares after every talk."""
+
+    def __init__(self, overhead_s: float = 4.0, ratio: float = 1.5, rate: float = 0.2):
+        self.overhead_s = overhead_s
+        self.ratio = ratio
+        self.rate = rate
+        self.samples = 0
+
+    def predict(self, audio_s: float) -> float:
+        return self.overhead_s + self.ratio * audio_s
+
+    def observe(self, audio_s: float, render_s: float) -> None:
+        error = render_s - self.predict(audio_s)
+        self.overhead_s = max(self.overhead_s + self.rate * error / 2, 0.5)
+        if audio_s > 0:
+            self.ratio = max(self.ratio + self.rate * error / 2 / audio_s, 0.05)
+        self.samples += 1
+
+
+model = RenderModel()
+
+
+@dataclass
+class _Job:
+    talk_id: str
+    request_kwargs: dict
+    audio_s: float
+    predicted_s: float
+    deadline: float
+    cancel: threading.Event | None
+    started: float = field(default_factory=time.monotonic)
+    done: threading.Event = field(default_factory=threading.Event)
+    status: str = "pending"  # pending | done | failed | timeout | cancelled
+    result_url: str | None = None
+    interval: float = POLL_MIN_S
+    last_poll: float | None = None
+    polls: int = 0
+    overshoot_s: float | None = None
+
+
+def _schedule(job: _Job, delay: float) -> None:
+    with _lock:
+        heapq.heappush(_heap, (time.monotonic() + delay, next(_seq), job))
+        _lock.notify()
+
+
+def _run_scheduler() -> None:
+    while True:
+        with _lock:
+            while not _heap or _heap[0][0] > time.monotonic():
+                _lock.wait(_heap[0][0] - time.monotonic() if _heap else None)
+            _, _, job = heapq.heappop(_heap)
+        if not job.done.is_set():
+            _workers.submit(_poll, job)
+
+
+def _completed_at(data: dict) -> float | None:
+    """D-ID's own completion time as a monotonic timestamp, if the response has one."""
+    stamp = data.get("completed_at") or data.get("modified_at")
+    if not stamp:
+        return None
+    try:
+        wall = datetime.fromisoformat(stamp.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+    return time.monotonic() - max(time.time() - wall, 0.0)
+
+
+def _finish(job: _Job, status: str, url: str | None = None) -> None:
+    if job.done.is_set():
+        return
+    job.status, job.result_url = status, url
+    job.done.set()
+
+
+def _next_delay(job: _Job) -> float:
+    until_predicted = job.started + job.predicted_s - time.monotonic()
+    if until_predicted > POLL_MIN_S:
+        return until_predicted  # still well before it should be done
+    delay = job.interval * random.uniform(1 - JITTER, 1 + JITTER)
+    job.interval = min(job.interval * BACKOFF_FACTOR, POLL_MAX_S)
+    return delay
+
+
+def _poll(job: _Job) -> None:
+    now = time.monotonic()
+    if job.cancel is not None and job.cancel.is_set():
+        _finish(job, "cancelled")
+        return
+    if now > job.deadline:
+        _finish(job, "timeout")
+        return
+    previous, job.last_poll = job.last_poll, now
+    job.polls += 1
+    try:
+        resp = http_sessions.session("did").get(
+            f"{DID_API_URL}/talks/{job.talk_id}", timeout=15, **job.request_kwargs
+        )
+        resp.raise_for_status()
+        data = resp.json()
+    except Exception as exc:
+        logger.warning("D-ID poll of %s failed: %s", job.talk_id, exc)
+        _schedule(job, _next_delay(job))
+        return
+
+    status = data.get("status")
+    if status == "done":
+        completed = _completed_at(data)
+        if completed is not None and completed <= now:
+            job.overshoot_s = now - completed
+        else:
+            job.overshoot_s = (now - previous) / 2 if previous else 0.0
+        _finish(job, "done", data.get("result_url"))
+    elif status in {"error", "rejected"}:
+        logger.error("D-ID talk %s failed: %s", job.talk_id, data)
+        _finish(job, "failed")
+    else:
+        _schedule(job, _next_delay(job))
+
+
+def _ensure_scheduler() -> None:
+    with _lock:
+        if _thread["started"]:
+            return
+        _thread["started"] = True
+    threading.Thread(target=_run_scheduler, name="did-poller", daemon=True).start()
+
+
+def _record(job: _Job, waited: float) -> None:
+    if job.status == "done":
+        overshoot = job.overshoot_s or 0.0
+        with _lock:
+            model.observe(job.audio_s, waited - overshoot)
+        latency_stats.record("did.wait", waited)
+        latency_stats.record("did.overshoot", overshoot)
+    _recent.append({
+        "talk_id": job.talk_id,
+        "status": job.status,
+        "audio_s": round(job.audio_s, 2),
+        "predicted_s": round(job.predicted_s, 2),
+        "wait_s": round(waited, 2),
+        "overshoot_s": round(job.overshoot_s, 2) if job.overshoot_s is not None else None,
+        "polls": job.polls,
+    })
+    logger.info(
+        "D-ID talk %s %s after %.1fs (predicted %.1fs, %d polls, overshoot %s)",
+        job.talk_id, job.status, waited, job.predicted_s, job.polls,
+        f"{job.overshoot_s:.2f}s" if job.overshoot_s is not None else "n/a",
+    )
+
+
+def wait_for_talk(
+    talk_id: str,
+    audio_s: float | None = None,
+    text: str | None = None,
+    request_kwargs: dict | None = None,
+    timeout_s: float = 120,
+    cancel: threading.Event | None = None,
+) -> str | None:
+    """Block until the talk is done and return its result URL (None on failure, timeout or cancel).
+
+    ``audio_s`` is the driving audio's duration; for text-driven talks pass
+    ``text`` instead. ``request_kwargs`` carries the caller's auth
+    (``auth=`` or ``headers=``) for the status requests.
+    """
+    if audio_s is None:
+        audio_s = len(text or "") / SPEECH_CHARS_PER_S
+    predicted = model.predict(audio_s)
+    job = _Job(
+        talk_id=talk_id,
+        request_kwargs=request_kwargs or {},
+        audio_s=audio_s,
+        predicted_s=predicted,
+        deadline=time.monotonic() + timeout_s,
+        cancel=cancel,
+    )
+    _ensure_scheduler()
+    _schedule(job, max(predicted * EARLY_FRACTION, POLL_MIN_S))
+    while not job.done.wait(0.25):
+        if cancel is not None and cancel.is_set():
+            _finish(job, "cancelled")
+        elif time.monotonic() > job.deadline:
+            _finish(job, "timeout")
+    _record(job, time.monotonic() - job.started)
+    if job.status == "timeout":
+        logger.warning("D-ID talk %s timed out after %ss", talk_id, timeout_s)
+    return job.result_url
+
+
+def poller_stats() -> dict:
+    with _lock:
+        outstanding = sum(1 for _, _, job in _heap if not job.done.is_set())
+    return {
+        "model": {"overhead_s": round(model.overhead_s, 2), "ratio": round(model.ratio, 3), "samples": model.samples},
+        "outstanding": outstanding,
+        "recent": list(_recent),
+    }
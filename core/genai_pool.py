@@ -0,0 +1,56 @@
+"""Process-wide registry of reusable ``genai.Client`` instances.
+
+Constructing a client per request throws away its HTTP connection pool, so
+every Gemini call pays a fresh TCP + TLS handshake. Clients here are created
+once per (API key, http options) pair and shared by every Streamlit script
+thread in the process; the underlying HTTP client is thread-safe.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+
+from google import genai
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_clients: dict[tuple[str, str], genai.Client] = {}
+_entries: dict[tuple[str, str], dict] = {}
+
+
+def _pool_key(api_key: str, http_options: dict | None) -> tuple[str, str]:
+    # Only a fingerprint of the key is kept, so stats never expose secrets.
+    fingerprint = hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:12]
+    return fingerprint, json.dumps(http_options or {}, sort_keys=True, default=str)
+
+
+def get_client(api_key: str, http_options: dict | None = None) -> genai.Client:
+    """Return the shared client for this key and option set, creating it once."""
+    key = _pool_key(api_key, http_options)
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            kwargs = {"api_key": api_key}
+            if http_options:
+                kwargs["http_options"] = http_options
+            client = genai.Client(**kwargs)
+            _clients[key] = client
+            _entries[key] = {"created_at": time.time(), "uses": 0}
+            logger.info("genai client created (key=%s, options=%s)", key[0], key[1])
+        _entries[key]["uses"] += 1
+        _entries[key]["last_used"] = time.time()
+    return client
+
+
+def pool_stats() -> dict:
+    with _lock:
+        return {
+            "clients": len(_clients),
+            "requests": sum(e["uses"] for e in _entries.values()),
+            "entries": [
+                {"key": k[0], "options": k[1], **e} for k, e in _entries.items()
+            ],
+        }
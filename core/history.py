@@ -0,0 +1,105 @@
+"""Token-budgeted conversation history.
+
+Sending the whole transcript every turn makes prompt size — and latency —
+grow linearly over a booth session. ``build_contents`` keeps the most recent
+turns that fit in a token budget and folds everything older into a short
+rolling summary, so a visitor's 50th question costs about the same as their
+5th. Used by both the text model (llm_client) and Gemini Live (live_client).
+
+Token counts are estimated locally (no API round trip) and cached per
+message, so re-windowing the same history on every turn is cheap.
+
+Environment:
+  HISTORY_TOKEN_BUDGET   tokens of verbatim recent history   (default 2000)
+  HISTORY_SUMMARY_TOKENS tokens of rolling summary           (default 300)
+  HISTORY_CONTEXT_BUDGET cap on system prompt + history + question,
+                         0 = no cap                          (default 0)
+"""
+
+import os
+import re
+from functools import lru_cache
+
+from google.genai import types
+
+TOKEN_BUDGET = int(os.environ.get("HISTORY_TOKEN_BUDGET", "2000"))
+SUMMARY_TOKENS = int(os.environ.get("HISTORY_SUMMARY_TOKENS", "300"))
+CONTEXT_BUDGET = int(os.environ.get("HISTORY_CONTEXT_BUDGET", "0"))
+
+# Gemini tokenizes English at roughly four characters per token.
+CHARS_PER_TOKEN = 4
+
+_FIRST_SENTENCE = re.compile(r"^(.+?[.!?])(\s|$)", re.S)
+
+
+@lru_cache(maxsize=4096)
+def estimate_tokens(text: str) -> int:
+    """Cheap local token estimate, cached per distinct string."""
+    return max(1, (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN)
+
+
+@lru_cache(maxsize=4096)
+def _summary_line(role: str, content: str) -> str:
+    text = " ".join(content.split())
+    m = _FIRST_SENTENCE.match(text)
+    gist = m.group(1) if m else text
+    if len(gist) > 160:
+        gist = gist[:157].rstrip() + "..."
+    return f"- {'Visitor asked' if role == 'user' else 'You said'}: {gist}"
+
+
+def fit(conversation_history: list, budget: int = TOKEN_BUDGET) -> tuple[str | None, list]:
+    """Split history into (summary of older turns, recent messages within budget).
+
+    Recent history always starts on a visitor message and always includes
+    the latest exchange, even if that alone exceeds the budget.
+    """
+    used = 0
+    start = len(conversation_history)
+    for i in range(len(conversation_history) - 1, -1, -1):
+        used += estimate_tokens(conversation_history[i]["content"])
+        if used > budget and len(conversation_history) - i > 2:
+            break
+        start = i
+    while start < len(conversation_history) and conversation_history[start]["role"] != "user":
+        start += 1
+
+    older = conversation_history[:start]
+    if not older:
+        return None, conversation_history[start:]
+
+    # Rolling: keep the gist of the most recent older turns that fit.
+    lines, used = [], 0
+    for msg in reversed(older):
+        line = _summary_line(msg["role"], msg["content"])
+        used += estimate_tokens(line)
+        if used > SUMMARY_TOKENS:
+            break
+        lines.append(line)
+    summary = "Summary of the earlier conversation with this visitor:\n" + "\n".join(reversed(lines))
+    return summary, conversation_history[start:]
+
+
+def build_contents(
+    conversation_history: list,
+    user_message: str,
+    budget: int = TOKEN_BUDGET,
+    prompt_tokens: int = 0,
+) -> list[types.Content]:
+    """Gemini ``contents`` for a turn: summary, recent history, then the new message.
+
+    ``prompt_tokens`` is the system prompt's size; with HISTORY_CONTEXT_BUDGET
+    set, history gets whatever the prompt and question leave over.
+    """
+    if CONTEXT_BUDGET:
+        remaining = CONTEXT_BUDGET - prompt_tokens - SUMMARY_TOKENS - estimate_tokens(user_message)
+        budget = max(min(budget, remaining), 0)
+    summary, recent = fit(conversation_history, budget)
+    contents = []
+    if summary:
+        contents.append(types.Content(role="user", parts=[types.Part.from_text(text=summary)]))
+    for msg in recent:
+        role = "model" if msg["role"] == "assistant" else "user"
+        contents.append(types.Content(role=role, parts=[types.Part.from_text(text=msg["content"])]))
+    contents.append(types.Content(role="user", parts=[types.Part.from_text(text=user_message)]))
+    return contents
@@ -0,0 +1,122 @@
+"""Shared, pooled HTTP sessions for the TTS and lip-sync providers.
+
+Module-level ``requests.post``/``requests.get`` open a fresh TCP+TLS
+connection per call, which costs a few hundred milliseconds on every
+sentence of every reply. Each provider gets one ``requests.Session`` per
+process instead, with a connection pool sized for the sentence pipeline and
+automatic retries (exponential backoff, ``Retry-After`` honoured) on 429
+and 5xx responses and on connection errors.
+
+Every request is counted per host, together with the number of TCP
+connections the pool actually opened, so ``connection_stats`` shows how
+well keep-alive is working; request latency goes into core.latency_stats
+as ``http.<host>``.
+
+Environment:
+  HTTP_POOL_SIZE   connections kept alive per host (default 16)
+  HTTP_RETRIES     retries on 429/5xx/connection errors (default 3)
+  HTTP_BACKOFF_S   base of the exponential backoff between retries (default 0.5)
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from core import latency_stats
+
+logger = logging.getLogger(__name__)
+
+POOL_SIZE = int(os.environ.get("HTTP_POOL_SIZE", "16"))
+RETRIES = int(os.environ.get("HTTP_RETRIES", "3"))
+BACKOFF_S = float(os.environ.get("HTTP_BACKOFF_S", "0.5"))
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_lock = threading.Lock()
+_sessions: dict[str, requests.Session] = {}
+_adapters: dict[str, "_MeteredAdapter"] = {}
+_stats: dict[tuple[str, str], Counter] = {}
+
+
+class _MeteredAdapter(HTTPAdapter):
+    """HTTPAdapter that counts requests, errors and latency per host."""
+
+    def __init__(self, provider: str, **kwargs):
+        self.provider = provider
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        host = urlsplit(request.url).netloc
+        start = time.monotonic()
+        try:
+            resp = super().send(request, **kwargs)
+        except Exception:
+            _count(self.provider, host, "errors")
+            raise
+        latency_stats.record(f"http.{host}", time.monotonic() - start)
+        _count(self.provider, host, "requests")
+        if resp.status_code >= 400:
+            _count(self.provider, host, f"status_{resp.status_code}")
+        return resp
+
+    def connections_opened(self) -> dict[str, int]:
+        """TCP connections opened so far, per host, across this adapter's pools."""
+        opened: Counter = Counter()
+        for pool_key in list(self.poolmanager.pools.keys()):
+            pool = self.poolmanager.pools.get(pool_key)
+            if pool is not None:
+                opened[pool_key.key_host] += pool.num_connections
+        return dict(opened)
+
+
+def _count(provider: str, host: str, stat: str) -> None:
+    with _lock:
+        _stats.setdefault((provider, host), Counter())[stat] += 1
+
+
+def session(provider: str) -> requests.Session:
+    """The process-wide session for ``provider`` (e.g. "elevenlabs", "did")."""
+    with _lock:
+        s = _sessions.get(provider)
+        if s is None:
+            retry = Retry(
+                total=RETRIES,
+                backoff_factor=BACKOFF_S,
+                status_forcelist=RETRY_STATUSES,
+                allowed_methods=None,  # provider POSTs are generation requests; retrying is safe
+                respect_retry_after_header=True,
+                raise_on_status=False,
+            )
+            adapter = _MeteredAdapter(
+                provider, pool_connections=4, pool_maxsize=POOL_SIZE, max_retries=retry,
+            )
+            s = requests.Session()
+            s.mount("https://", adapter)
+            s.mount("http://", adapter)
+            _sessions[provider], _adapters[provider] = s, adapter
+            logger.info("HTTP session for %s (pool %d, %d retries)", provider, POOL_SIZE, RETRIES)
+        return s
+
+
+def connection_stats() -> dict[str, dict[str, dict]]:
+    """Per provider and host: requests sent, connections opened, reuse ratio, errors."""
+    with _lock:
+        stats = {key: dict(c) for key, c in _stats.items()}
+        adapters = dict(_adapters)
+    opened = {p: a.connections_opened() for p, a in adapters.items()}
+    out: dict[str, dict[str, dict]] = {}
+    for (provider, host), counts in stats.items():
+        connections = opened.get(provider, {}).get(host.split(":")[0], 0)
+        sent = counts.get("requests", 0)
+        out.setdefault(provider, {})[host] = {
+            **counts,
+            "connections": connections,
+            "reuse_ratio": round(1 - connections / sent, 3) if sent else 0.0,
+        }
+    return out
@@ -0,0 +1,84 @@
+"""Per-provider latency histograms.
+
+Upstream calls record how long they took under a metric name such as
+``elevenlabs.first_byte`` or ``edge.total``. Buckets are log-spaced from
+20 ms to 60 s, so percentiles stay accurate to a few percent while each
+histogram is a fixed-size array, cheap to update from any thread.
+
+The hedging policy in voice_client reads p95 from here to decide when a
+provider is "late"; ``snapshot`` is for logs and dashboards.
+"""
+
+import bisect
+import math
+import threading
+
+_MIN_S = 0.02
+_MAX_S = 60.0
+_BUCKETS_PER_DOUBLING = 4
+_BOUNDS = [
+    _MIN_S * 2 ** (i / _BUCKETS_PER_DOUBLING)
+    for i in range(int(math.log2(_MAX_S / _MIN_S) * _BUCKETS_PER_DOUBLING) + 1)
+]
+
+
+class LatencyHistogram:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = [0] * (len(_BOUNDS) + 1)
+        self.count = 0
+        self.total_s = 0.0
+
+    def record(self, seconds: float) -> None:
+        i = bisect.bisect_left(_BOUNDS, seconds)
+        with self._lock:
+            self._counts[i] += 1
+            self.count += 1
+            self.total_s += seconds
+
+    def percentile(self, p: float) -> float | None:
+        """Upper bound of the bucket holding the p-th percentile (0-100), or None if empty."""
+        with self._lock:
+            if not self.count:
+                return None
+            rank = math.ceil(self.count * p / 100)
+            seen = 0
+            for i, n in enumerate(self._counts):
+                seen += n
+                if seen >= rank:
+                    return _BOUNDS[i] if i < len(_BOUNDS) else _MAX_S
+        return _MAX_S
+
+
+_lock = threading.Lock()
+_histograms: dict[str, LatencyHistogram] = {}
+
+
+def histogram(name: str) -> LatencyHistogram:
+    with _lock:
+        return _histograms.setdefault(name, LatencyHistogram())
+
+
+def record(name: str, seconds: float) -> None:
+    histogram(name).record(seconds)
+
+
+def percentile(name: str, p: float, min_samples: int = 1) -> float | None:
+    """p-th percentile of ``name``, or None until ``min_samples`` were recorded."""
+    h = histogram(name)
+    return h.percentile(p) if h.count >= min_samples else None
+
+
+def snapshot() -> dict[str, dict]:
+    with _lock:
+        items = list(_histograms.items())
+    return {
+        name: {
+            "count": h.count,
+            "mean": round(h.total_s / h.count, 3) if h.count else None,
+            "p50": h.percentile(50),
+            "p95": h.percentile(95),
+            "p99": h.percentile(99),
+        }
+        for name, h in items
+    }
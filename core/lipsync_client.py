@@ -1,26 +1,54 @@
-"""Wav2Lip lip-sync client — generates talking avatar videos locally on GPU.
+"""Wav2Lip lip-sync client — generates talking avatar videos locally.
 
 Requires:  pip install lipsync torch torchvision
 Weights:   auto-downloaded from HuggingFace on first run (~400 MB).
+
+Models are loaded into a small pool by ``warm_up`` at app start rather than
+by the first visitor's render, and run on CPU when there is no GPU. Warm-up
+also renders a short silent clip per leader image, which leaves that
+image's face detection (crops and landmarks) in the package's on-disk cache;
+images are passed under content-hash names, so the cache is per image and
+survives restarts. Every render writes to its own output file.
+
+Environment:
+  WAV2LIP_DEVICE     auto | cpu | cuda                           (default auto)
+  WAV2LIP_POOL_SIZE  models kept loaded, one render each at a time (default 1)
+  WAV2LIP_THREADS    torch CPU threads per process, 0 = torch default (default 0)
 """
 
+import hashlib
 import logging
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import uuid
+import wave
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
 WEIGHTS_DIR = Path("weights")
 VIDEOS_DIR = Path("assets/videos")
+FACE_CACHE_DIR = WEIGHTS_DIR / "face_cache"
 WAV2LIP_URL = (
     "https://huggingface.co/Nekochu/Wav2Lip/resolve/main/wav2lip.pth"
 )
+DEVICE = os.environ.get("WAV2LIP_DEVICE", "auto").strip().lower()
+POOL_SIZE = max(int(os.environ.get("WAV2LIP_POOL_SIZE", "1")), 1)
+THREADS = int(os.environ.get("WAV2LIP_THREADS", "0"))
+WARM_AUDIO_S = 0.5
 
-_lip = None
+_pool: queue.Queue = queue.Queue()
+_pool_lock = threading.Lock()
+_pool_state = {"loaded": 0, "device": None}
 
 
 def _ensure_dirs():
     WEIGHTS_DIR.mkdir(exist_ok=True)
     VIDEOS_DIR.mkdir(parents=True, exist_ok=True)
+    FACE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
 
 
 def _download_weights() -> str:
@@ -36,22 +64,63 @@ def _download_weights() -> str:
     return str(model_path)
 
 
-def _get_lip():
-    """Lazy-init the LipSync model (heavy — loaded only once per process)."""
-    global _lip
-    if _lip is not None:
-        return _lip
+def _device() -> str:
+    if DEVICE in {"cpu", "cuda"}:
+        return DEVICE
+    try:
+        import torch
+        return "cuda" if torch.cuda.is_available() else "cpu"
+    except ImportError:
+        return "cpu"
+
 
+def _load_lip():
+    """Load one LipSync model (heavy — a few seconds and ~400 MB each)."""
+    import torch
     from lipsync import LipSync
 
-    checkpoint = _download_weights()
-    _lip = LipSync(
+    device = _device()
+    if device == "cpu" and THREADS > 0:
+        torch.set_num_threads(THREADS)
+    lip = LipSync(
         model="wav2lip",
-        checkpoint_path=checkpoint,
-        device="cuda",
+        checkpoint_path=_download_weights(),
+        device=device,
         nosmooth=True,
+        cache_dir=str(FACE_CACHE_DIR),
+        save_cache=True,
     )
-    return _lip
+    _pool_state["device"] = device
+    return lip
+
+
+def _fill_pool() -> None:
+    with _pool_lock:
+        while _pool_state["loaded"] < POOL_SIZE:
+            _pool.put(_load_lip())
+            _pool_state["loaded"] += 1
+            logger.info("Wav2Lip model %d/%d loaded (%s)", _pool_state["loaded"], POOL_SIZE, _pool_state["device"])
+
+
+def _face_source(image_path: str) -> str:
+    """Copy of the image under its content hash, so cached face detection is per image."""
+    data = Path(image_path).read_bytes()
+    path = FACE_CACHE_DIR / f"{hashlib.sha256(data).hexdigest()[:16]}{Path(image_path).suffix}"
+    if not path.exists():
+        _ensure_dirs()
+        shutil.copyfile(image_path, path)
+    return str(path)
+
+
+def _silent_wav(seconds: float) -> str:
+    fd, path = tempfile.mkstemp(suffix=".wav")
+    os.close(fd)
+    with wave.open(path, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(16000)
+        w.writeframes(b"\0\0" * int(16000 * seconds))
+    return path
 
 
 def is_available() -> bool:
@@ -62,19 +131,50 @@ def is_available() -> bool:
         return False
 
 
+def warm_up(image_paths: list[str]) -> None:
+    """Load the model pool and precompute face detection for each image, in the background."""
+    if not is_available():
+        return
+
+    def _warm():
+        try:
+            _fill_pool()
+            silence = _silent_wav(WARM_AUDIO_S)
+            try:
+                for image_path in image_paths:
+                    if Path(image_path).exists():
+                        video = generate_talking_video(image_path, silence)
+                        if video:
+                            Path(video).unlink(missing_ok=True)
+            finally:
+                Path(silence).unlink(missing_ok=True)
+            logger.info("Wav2Lip warm: %d models, %d leader images", POOL_SIZE, len(image_paths))
+        except Exception as e:
+            logger.warning("Wav2Lip warm-up failed: %s", e)
+
+    threading.Thread(target=_warm, name="wav2lip-warm", daemon=True).start()
+
+
 def generate_talking_video(image_path: str, audio_path: str) -> str | None:
-    """Image + WAV audio → lip-synced MP4 (local path). None on failure."""
+    """Image + audio → lip-synced MP4 (local path, unique per call). None on failure.
+
+    The caller owns the returned file and should delete it once read.
+    """
     if not is_available():
         logger.warning("lipsync package not installed — pip install lipsync")
         return None
 
     _ensure_dirs()
     stem = Path(image_path).stem
-    output = str(VIDEOS_DIR / f"{stem}_talk.mp4")
+    output = str(VIDEOS_DIR / f"{stem}_{uuid.uuid4().hex[:12]}.mp4")
 
     try:
-        lip = _get_lip()
-        lip.sync(image_path, audio_path, output)
+        _fill_pool()
+        lip = _pool.get()
+        try:
+            lip.sync(_face_source(image_path), audio_path, output)
+        finally:
+            _pool.put(lip)
         out_path = Path(output)
         if out_path.exists() and out_path.stat().st_size > 0:
             logger.info("Lip-sync video → %s", output)
@@ -82,5 +182,5 @@ def generate_talking_video(image_path: str, audio_path: str) -> str | None:
         logger.warning("Wav2Lip produced empty output")
     except Exception as e:
         logger.error("Wav2Lip generation failed: %s", e)
-
+    Path(output).unlink(missing_ok=True)
     return None
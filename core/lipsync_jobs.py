@@ -0,0 +1,239 @@
+"""Background lip-sync job manager.
+
+Lip-sync renders take tens of seconds, so the chat turn never waits on them:
+``submit`` queues the render on a small worker pool and returns a job id, and
+the chat screen polls ``get_job`` on later reruns, swapping the video in once
+it is ready. Audio playback is independent of the job.
+
+Render time grows with the audio, so a reply is not rendered as one clip:
+``submit_chunks`` groups its sentence clips into a few chunks (the first one
+short) and renders them in parallel. The player shows each clip in turn as
+the audio reaches it, so the first chunk plays while later ones render.
+
+Providers, in auto-selection order:
+  fal      FAL.AI SadTalker        (needs FAL_KEY)
+  did      D-ID talks              (needs D_ID_API_KEY)
+  wav2lip  local Wav2Lip           (pip install lipsync; opt-in)
+
+Environment:
+  LIPSYNC_PROVIDER  force one provider (fal | did | wav2lip | none)
+  LIPSYNC_WORKERS   concurrent renders per process (default 3)
+  LIPSYNC_CHUNK_S   shortest chunk of audio rendered on its own, in seconds (default 4)
+  LIPSYNC_CHUNKS    most chunks one reply is split into (default LIPSYNC_WORKERS)
+"""
+
+import logging
+import os
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from core import lipsync_client, media_store, single_flight, voice_client
+from utils.helpers import mp3_duration_s
+
+logger = logging.getLogger(__name__)
+
+JOB_TTL_S = 30 * 60
+WORKERS = int(os.environ.get("LIPSYNC_WORKERS", "3"))
+CHUNK_MIN_S = float(os.environ.get("LIPSYNC_CHUNK_S", "4"))
+MAX_CHUNKS = max(int(os.environ.get("LIPSYNC_CHUNKS", str(WORKERS))), 1)
+_executor = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="lipsync")
+_lock = threading.Lock()
+_jobs: dict[str, "LipSyncJob"] = {}
+
+
+@dataclass
+class LipSyncJob:
+    id: str
+    provider: str
+    status: str = "queued"  # queued | running | done | failed | cancelled
+    video_url: str | None = None
+    error: str | None = None
+    submitted_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    cancel_event: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in {"done", "failed", "cancelled"}
+
+
+def provider() -> str | None:
+    """Name of the lip-sync backend jobs will use, or None if none is configured."""
+    forced = os.environ.get("LIPSYNC_PROVIDER", "").strip().lower()
+    if forced == "none":
+        return None
+    if forced == "wav2lip":
+        return "wav2lip" if lipsync_client.is_available() else None
+    if forced in {"", "fal"} and voice_client.fal_available():
+        return "fal"
+    if forced in {"", "did"} and voice_client.did_available():
+        return "did"
+    return None
+
+
+def warm_up(image_paths: list[str]) -> None:
+    """Preload the local renderer when it is the active provider (remote ones need no warm-up)."""
+    if provider() == "wav2lip":
+        lipsync_client.warm_up(image_paths)
+
+
+def _local_video_src(path: str) -> str | None:
+    return media_store.media_src(Path(path).read_bytes(), "mp4")
+
+
+def _render_wav2lip(audio_bytes: bytes, image_path: str, cancel: threading.Event | None = None) -> str | None:
+    with tempfile.NamedTemporaryFile(suffix=".mp3", delete=False) as f:
+        f.write(audio_bytes)
+        audio_path = f.name
+    video_path = None
+    try:
+        video_path = lipsync_client.generate_talking_video(image_path, audio_path)
+        return _local_video_src(video_path) if video_path else None
+    finally:
+        Path(audio_path).unlink(missing_ok=True)
+        if video_path:
+            Path(video_path).unlink(missing_ok=True)  # now in the media store
+
+
+_RENDERERS = {
+    "fal": voice_client._generate_lip_sync_fal,
+    "did": voice_client._generate_lip_sync_did,
+    "wav2lip": _render_wav2lip,
+}
+
+
+def _render(
+    name: str,
+    audio_bytes: bytes,
+    image_path: str,
+    cancel: threading.Event | None = None,
+) -> str | None:
+    # Sessions replaying the same stored answer submit identical renders.
+    # A caller that cancels stops waiting at once; the shared render is only
+    # stopped upstream (FAL, D-ID) once every session waiting on it has cancelled.
+    return single_flight.do_cancellable(
+        single_flight.key("lipsync", name, audio_bytes, image_path),
+        lambda shared_cancel: _RENDERERS[name](audio_bytes, image_path, shared_cancel),
+        cancel,
+    )
+
+
+def render(audio_bytes: bytes, image_path: str, provider_name: str | None = None) -> str | None:
+    """Render on the calling thread (batch and warm-up work); returns the video src."""
+    name = provider_name or provider()
+    if not name or not audio_bytes or not Path(image_path).exists():
+        return None
+    return _render(name, audio_bytes, image_path)
+
+
+def _run(job: LipSyncJob, audio_bytes: bytes, image_path: str) -> None:
+    if job.cancel_event.is_set():
+        return
+    job.status = "running"
+    job.started_at = time.time()
+    try:
+        video_url = _render(job.provider, audio_bytes, image_path, job.cancel_event)
+    except Exception as exc:
+        video_url = None
+        job.error = str(exc)
+    job.finished_at = time.time()
+    if job.cancel_event.is_set():
+        job.status = "cancelled"
+        return
+    job.video_url = video_url
+    job.status = "done" if video_url else "failed"
+    logger.info(
+        "Lip-sync job %s %s in %.1fs (%s)",
+        job.id, job.status, job.finished_at - job.started_at, job.provider,
+    )
+
+
+def _prune() -> None:
+    cutoff = time.time() - JOB_TTL_S
+    for job_id in [j for j, job in _jobs.items() if job.finished and job.submitted_at < cutoff]:
+        del _jobs[job_id]
+
+
+def submit(audio_bytes: bytes, image_path: str, provider_name: str | None = None) -> str | None:
+    """Queue a lip-sync render and return its job id (None if no provider)."""
+    name = provider_name or provider()
+    if not name or not audio_bytes or not Path(image_path).exists():
+        return None
+    job = LipSyncJob(id=uuid.uuid4().hex[:12], provider=name)
+    with _lock:
+        _prune()
+        _jobs[job.id] = job
+    _executor.submit(_run, job, audio_bytes, image_path)
+    return job.id
+
+
+def split_chunks(
+    parts: list[bytes], min_s: float = CHUNK_MIN_S, max_chunks: int = MAX_CHUNKS
+) -> list[tuple[bytes, float]]:
+    """Group consecutive sentence MP3s into ``(audio, seconds)`` chunks to render separately.
+
+    The first chunk is kept short (``min_s``) so its video arrives early;
+    the rest share the remaining audio evenly. Cuts only fall between
+    sentences, where the speech pauses.
+    """
+    durations = [mp3_duration_s(p) or 0.0 for p in parts]
+    chunks: list[tuple[bytes, float]] = []
+    current, current_s = b"", 0.0
+    remaining = sum(durations)
+    for part, dur in zip(parts, durations):
+        current, current_s = current + part, current_s + dur
+        remaining -= dur
+        if chunks:
+            target = max(min_s, (current_s + remaining) / max(max_chunks - len(chunks), 1))
+        else:
+            target = min_s
+        if current_s >= target and remaining >= min_s / 2 and len(chunks) < max_chunks - 1:
+            chunks.append((current, current_s))
+            current, current_s = b"", 0.0
+    if current:
+        chunks.append((current, current_s))
+    return chunks
+
+
+def submit_chunks(parts: list[bytes], image_path: str, provider_name: str | None = None) -> list[dict]:
+    """Render a reply's sentence clips as a few parallel jobs.
+
+    Returns one ``{"job_id", "start", "duration"}`` per chunk in playing
+    order (``start`` is the chunk's offset in the joined audio, in seconds),
+    or an empty list if no provider is configured.
+    """
+    chunks = []
+    start = 0.0
+    for audio, duration in split_chunks([p for p in parts if p]):
+        job_id = submit(audio, image_path, provider_name)
+        if not job_id:
+            for chunk in chunks:
+                cancel(chunk["job_id"])
+            return []
+        chunks.append({"job_id": job_id, "start": round(start, 3), "duration": round(duration, 3)})
+        start += duration
+    if len(chunks) > 1:
+        logger.info("Lip-sync split into %d chunks: %s", len(chunks), [c["duration"] for c in chunks])
+    return chunks
+
+
+def get_job(job_id: str | None) -> LipSyncJob | None:
+    if not job_id:
+        return None
+    with _lock:
+        return _jobs.get(job_id)
+
+
+def cancel(job_id: str | None) -> None:
+    """Stop a job: a queued job never starts, a running one is cancelled upstream where possible."""
+    job = get_job(job_id)
+    if job and not job.finished:
+        job.cancel_event.set()
+        if job.status == "queued":
+            job.status = "cancelled"
@@ -5,28 +5,30 @@ Returns both text (transcription/fallback) and a WAV audio file for
 downstream lip-sync video generation.
 """
 
-import asyncio
 import logging
 import os
-import threading
 import wave
 from pathlib import Path
 
 from google import genai
 from google.genai import types
 
+from core import history, loop_service, prompt_registry
+from core.genai_pool import get_client
+
 logger = logging.getLogger(__name__)
 
 LIVE_MODEL = "models/gemini-2.5-flash-native-audio-preview-12-2025"
 RECEIVE_SAMPLE_RATE = 24000
 AUDIO_DIR = Path("assets/audio")
+LIVE_TIMEOUT_S = 20
 
 
 def _get_client() -> genai.Client:
     api_key = os.environ.get("GOOGLE_API_KEY", "")
     if not api_key:
         raise ValueError("GOOGLE_API_KEY not set.")
-    return genai.Client(api_key=api_key, http_options={"api_version": "v1beta"})
+    return get_client(api_key, {"api_version": "v1beta"})
 
 
 def _save_wav(pcm_data: bytes, path: str) -> None:
@@ -66,20 +68,9 @@ async def _live_response(
     text_parts: list[str] = []
 
     async with client.aio.live.connect(model=LIVE_MODEL, config=config) as session:
-        turns: list[types.Content] = []
-        for msg in conversation_history:
-            role = "model" if msg["role"] == "assistant" else "user"
-            turns.append(
-                types.Content(
-                    role=role,
-                    parts=[types.Part.from_text(text=msg["content"])],
-                )
-            )
-        turns.append(
-            types.Content(
-                role="user",
-                parts=[types.Part.from_text(text=user_message)],
-            )
+        turns = history.build_contents(
+            conversation_history, user_message,
+            prompt_tokens=prompt_registry.token_count(system_prompt),
         )
 
         await session.send_client_content(turns=turns, turn_complete=True)
@@ -107,7 +98,7 @@ def transcribe_audio(audio_bytes: bytes, mime_type: str = "audio/wav") -> str:
     api_key = os.environ.get("GOOGLE_API_KEY", "")
     if not api_key:
         return ""
-    client = genai.Client(api_key=api_key)
+    client = get_client(api_key)
     try:
         response = client.models.generate_content(
             model="gemini-2.5-flash",
@@ -136,31 +127,17 @@ def get_live_response(
 ) -> tuple[str, str | None]:
     """Synchronous wrapper safe for Streamlit's threading model.
 
+    Runs on the shared background loop (core.loop_service).
+
     Returns (text_response, wav_audio_path).
     text_response may be empty if transcription is unavailable — the caller
     should fall back to the regular text model in that case.
     """
-    result: tuple[str, str | None] = ("", None)
-    error: list[BaseException | None] = [None]
-
-    def _run():
-        nonlocal result
-        try:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            result = loop.run_until_complete(
-                _live_response(
-                    system_prompt, conversation_history, user_message, voice_name
-                )
-            )
-            loop.close()
-        except Exception as exc:
-            error[0] = exc
-
-    thread = threading.Thread(target=_run, daemon=True)
-    thread.start()
-    thread.join(timeout=20)
-
-    if error[0]:
-        logger.error("Gemini Live API failed: %s", error[0])
-    return result
+    try:
+        return loop_service.run(
+            _live_response(system_prompt, conversation_history, user_message, voice_name),
+            timeout=LIVE_TIMEOUT_S,
+        )
+    except Exception as exc:
+        logger.error("Gemini Live API failed: %s", exc)
+    return "", None
@@ -1,30 +1,84 @@
+import logging
 import os
+import threading
+from collections import Counter
 import streamlit as st
 from typing import Generator
 from google import genai
-from google.genai import types
+from google.genai import errors, types
+
+from core import context_cache, prompt_registry, single_flight
+from core.history import build_contents, estimate_tokens
+from core.genai_pool import get_client
+
+logger = logging.getLogger(__name__)
+
+_usage_lock = threading.Lock()
+_usage: Counter = Counter()
 
 MODEL = "gemini-2.5-flash"
+# A cached-content handle the API no longer knows (expired, deleted) comes
+# back as one of these; anything else (429, 5xx) says nothing about the cache.
+CACHE_REJECTED_CODES = {400, 403, 404}
 
 
 def _get_client() -> genai.Client:
     api_key = os.environ.get("GOOGLE_API_KEY", "")
-    if not api_key and "GOOGLE_API_KEY" in st.secrets:
-        api_key = st.secrets["GOOGLE_API_KEY"]
+    if not api_key:
+        try:
+            api_key = st.secrets.get("GOOGLE_API_KEY", "")
+        except Exception:  # no secrets file (e.g. the pre-render CLI)
+            pass
 
     if not api_key:
         raise ValueError(
             "GOOGLE_API_KEY not set. Please set it as an environment variable."
         )
-    return genai.Client(api_key=api_key)
+    # GEMINI_BASE_URL points the client at a stand-in server for local testing.
+    base_url = os.environ.get("GEMINI_BASE_URL")
+    return get_client(api_key, {"base_url": base_url} if base_url else None)
+
+
+def warm_up() -> None:
+    """Open the pooled Gemini connection before the first visitor asks."""
+    try:
+        _get_client().models.get(model=MODEL)
+    except Exception as exc:
+        logger.warning("Gemini warm-up failed: %s", exc)
+
+
+def _cache_rejected(exc: errors.APIError) -> bool:
+    return getattr(exc, "code", None) in CACHE_REJECTED_CODES
+
+
+def _prepare(system_prompt: str, conversation_history: list, user_message: str):
+    """Client, windowed contents and cached-prompt handle for one call; records usage."""
+    client = _get_client()
+    prompt_tokens = prompt_registry.token_count(system_prompt)
+    history = build_contents(conversation_history, user_message, prompt_tokens=prompt_tokens)
+    handle = context_cache.get_handle(client, MODEL, system_prompt)
+    with _usage_lock:
+        _usage["calls"] += 1
+        _usage["prompt_tokens_cached" if handle else "prompt_tokens_inline"] += prompt_tokens
+        _usage["history_tokens"] += sum(estimate_tokens(p.text) for c in history for p in c.parts)
+    return client, history, handle
+
+
+def usage_stats() -> dict[str, int]:
+    """Estimated input tokens sent so far, split by where the system prompt came from."""
+    with _usage_lock:
+        return dict(_usage)
+
+
+def _generation_config(system_prompt: str, cached_content: str | None = None) -> types.GenerateContentConfig:
+    if cached_content:
+        return types.GenerateContentConfig(cached_content=cached_content, max_output_tokens=4096, temperature=0.8)
+    return types.GenerateContentConfig(system_instruction=system_prompt, max_output_tokens=4096, temperature=0.8)
 
 
-def _build_history(conversation_history: list) -> list[types.Content]:
-    history = []
-    for msg in conversation_history:
-        role = "model" if msg["role"] == "assistant" else "user"
-        history.append(types.Content(role=role, parts=[types.Part.from_text(text=msg["content"])]))
-    return history
+def _flight_key(kind: str, system_prompt: str, conversation_history: list, user_message: str) -> str:
+    history = [(m["role"], m["content"]) for m in conversation_history]
+    return single_flight.key(kind, MODEL, system_prompt, history, user_message)
 
 
 def stream_leader_response(
@@ -32,21 +86,43 @@ def stream_leader_response(
     conversation_history: list,
     user_message: str,
 ) -> Generator[str, None, None]:
-    client = _get_client()
-
-    config = types.GenerateContentConfig(
-        system_instruction=system_prompt,
-        max_output_tokens=4096,
-        temperature=0.8,
+    """Stream the reply. Identical concurrent requests (same prompt, history and
+    message, e.g. kiosks clicking the same scenario) share one upstream stream."""
+    yield from single_flight.stream(
+        _flight_key("stream", system_prompt, conversation_history, user_message),
+        lambda: _stream_leader_response(system_prompt, conversation_history, user_message),
     )
 
-    history = _build_history(conversation_history)
-    history.append(types.Content(role="user", parts=[types.Part.from_text(text=user_message)]))
+
+def _stream_leader_response(
+    system_prompt: str,
+    conversation_history: list,
+    user_message: str,
+) -> Generator[str, None, None]:
+    client, history, handle = _prepare(system_prompt, conversation_history, user_message)
+
+    if handle:
+        started = False
+        try:
+            for chunk in client.models.generate_content_stream(
+                model=MODEL,
+                contents=history,
+                config=_generation_config(system_prompt, handle),
+            ):
+                if chunk.text:
+                    started = True
+                    yield chunk.text
+            return
+        except errors.APIError as exc:
+            if started or not _cache_rejected(exc):
+                raise
+            logger.warning("Cached prompt %s rejected (%s); retrying inline", handle, exc)
+            context_cache.invalidate(MODEL, system_prompt)
 
     for chunk in client.models.generate_content_stream(
         model=MODEL,
         contents=history,
-        config=config,
+        config=_generation_config(system_prompt),
     ):
         if chunk.text:
             yield chunk.text
@@ -57,20 +133,37 @@ def get_leader_response(
     conversation_history: list,
     user_message: str,
 ) -> str:
-    client = _get_client()
-
-    config = types.GenerateContentConfig(
-        system_instruction=system_prompt,
-        max_output_tokens=4096,
-        temperature=0.8,
+    """Full reply in one call; identical concurrent requests share one upstream call."""
+    return single_flight.do(
+        _flight_key("generate", system_prompt, conversation_history, user_message),
+        lambda: _get_leader_response(system_prompt, conversation_history, user_message),
     )
 
-    history = _build_history(conversation_history)
-    history.append(types.Content(role="user", parts=[types.Part.from_text(text=user_message)]))
+
+def _get_leader_response(
+    system_prompt: str,
+    conversation_history: list,
+    user_message: str,
+) -> str:
+    client, history, handle = _prepare(system_prompt, conversation_history, user_message)
+
+    if handle:
+        try:
+            response = client.models.generate_content(
+                model=MODEL,
+                contents=history,
+                config=_generation_config(system_prompt, handle),
+            )
+            return response.text
+        except errors.APIError as exc:
+            if not _cache_rejected(exc):
+                raise
+            logger.warning("Cached prompt %s rejected (%s); retrying inline", handle, exc)
+            context_cache.invalidate(MODEL, system_prompt)
 
     response = client.models.generate_content(
         model=MODEL,
         contents=history,
-        config=config,
+        config=_generation_config(system_prompt),
     )
     return response.text
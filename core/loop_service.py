@@ -0,0 +1,58 @@
+"""Single background asyncio loop shared by the whole process.
+
+Edge TTS and Gemini Live are asyncio APIs, but Streamlit scripts run on plain
+threads. Instead of creating (and tearing down) a loop or a thread per call,
+coroutines are submitted to one long-lived loop thread and awaited through a
+``concurrent.futures.Future``. Because the loop is shared, coroutines from
+different callers — e.g. user and leader audio — actually run concurrently.
+"""
+
+import asyncio
+import concurrent.futures
+import logging
+import threading
+from typing import Any, Coroutine
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_loop: asyncio.AbstractEventLoop | None = None
+
+
+def _run_forever(loop: asyncio.AbstractEventLoop) -> None:
+    asyncio.set_event_loop(loop)
+    loop.run_forever()
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """Return the service loop, starting its thread on first use."""
+    global _loop
+    with _lock:
+        if _loop is None or _loop.is_closed():
+            _loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=_run_forever,
+                args=(_loop,),
+                name="asyncio-loop-service",
+                daemon=True,
+            ).start()
+            logger.info("asyncio loop service started")
+        return _loop
+
+
+def submit(coro: Coroutine[Any, Any, Any]) -> concurrent.futures.Future:
+    """Schedule a coroutine on the service loop and return its future."""
+    return asyncio.run_coroutine_threadsafe(coro, get_loop())
+
+
+def run(coro: Coroutine[Any, Any, Any], timeout: float | None = None) -> Any:
+    """Run a coroutine on the service loop and block for its result.
+
+    On timeout the coroutine is cancelled and ``TimeoutError`` is raised.
+    """
+    future = submit(coro)
+    try:
+        return future.result(timeout=timeout)
+    except concurrent.futures.TimeoutError:
+        future.cancel()
+        raise TimeoutError(f"coroutine did not finish within {timeout}s") from None
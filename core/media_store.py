@@ -0,0 +1,487 @@
+"""Content-addressed media store served over plain HTTP.
+
+Generated audio, lip-sync videos and avatar images are written once under
+``<sha256>.<ext>`` names and handed to the browser as short URLs instead of
+inline base64 data URIs, which bloat every websocket message by a third and
+pin megabytes per visitor in session state.
+
+A small threaded HTTP server (one per process) serves the directory with
+long-lived immutable cache headers, ETags and byte-range support (Safari
+won't play media without it). Files that haven't been touched for the TTL are
+garbage-collected in the background.
+
+The server listens on its own plain-HTTP port, which HTTPS deployments block
+as mixed content and port-forwarding hosts (Codespaces) expose under another
+hostname, so it is off unless ``MEDIA_SERVER_PORT`` is set. While it is off,
+or if it can't bind its port, every helper falls back to the old data-URI
+behaviour, so the app keeps working without the extra port.
+
+Audio that is still being generated upstream can be served as a *live
+stream* (``open_stream``): the browser gets a ``/live/<id>.<ext>`` URL and
+receives chunks as they arrive, so playback starts with the first chunk
+instead of the last. Once the stream completes it is stored like any other
+clip and the live URL redirects there. Browsers report time-to-first-sound
+for each turn back to ``/ttfs``.
+
+Environment:
+  MEDIA_DIR           storage directory                    (default assets/media)
+  MEDIA_SERVER_PORT   port for the media server, 0 = off   (default 0; e.g. 8502)
+  MEDIA_PUBLIC_URL    base URL the browser should use      (default http://<app host>:<port>)
+  MEDIA_TTL_HOURS     delete files idle longer than this   (default 24)
+"""
+
+import base64
+import hashlib
+import logging
+import mimetypes
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Iterable, Iterator
+from urllib.parse import parse_qs, quote, urlsplit
+
+from core import latency_stats
+from utils.helpers import get_image_base64, get_image_variant
+
+logger = logging.getLogger(__name__)
+
+MEDIA_DIR = Path(os.environ.get("MEDIA_DIR", "assets/media"))
+SERVER_PORT = int(os.environ.get("MEDIA_SERVER_PORT", "0"))
+TTL_S = float(os.environ.get("MEDIA_TTL_HOURS", "24")) * 3600
+GC_INTERVAL_S = 15 * 60
+URL_PREFIX = "/media/"
+LIVE_PREFIX = "/live/"
+TTFS_PATH = "/ttfs"
+LIVE_TTL_S = 10 * 60
+
+mimetypes.add_type("audio/mpeg", ".mp3")
+mimetypes.add_type("video/mp4", ".mp4")
+mimetypes.add_type("image/webp", ".webp")
+
+_NAME_RE = re.compile(r"^[0-9a-f]{16,64}\.[a-z0-9]{2,5}$")
+
+_lock = threading.Lock()
+_server_state = {"started": False, "ok": False}
+_pinned: set[str] = set()  # static assets referenced for the life of the process
+_file_names: dict[tuple[str, float], str] = {}
+_last_host = {"host": "localhost"}
+_live: dict[str, "LiveStream"] = {}
+_ttfs: OrderedDict[str, float] = OrderedDict()
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# Storage
+# ═══════════════════════════════════════════════════════════════════════════
+
+def put(data: bytes, ext: str) -> str:
+    """Store bytes under their content hash and return the file name."""
+    name = f"{hashlib.sha256(data).hexdigest()[:32]}.{ext.lstrip('.').lower()}"
+    path = MEDIA_DIR / name
+    if path.exists():
+        os.utime(path)  # keep it alive for the garbage collector
+        return name
+    MEDIA_DIR.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=MEDIA_DIR, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+    return name
+
+
+def get(name: str | None) -> bytes | None:
+    """Bytes stored under ``name``, refreshing its GC timestamp; None if gone."""
+    if not name or not _NAME_RE.match(name):
+        return None
+    path = MEDIA_DIR / name
+    try:
+        data = path.read_bytes()
+        os.utime(path)
+    except OSError:
+        return None
+    return data
+
+
+def put_file(path: str) -> str | None:
+    """Store a static file once per (path, mtime) and pin it against GC."""
+    p = Path(path)
+    try:
+        mtime = p.stat().st_mtime
+    except OSError:
+        return None
+    key = (str(p), mtime)
+    name = _file_names.get(key)
+    if name is None or not (MEDIA_DIR / name).exists():
+        name = put(p.read_bytes(), p.suffix or ".bin")
+        _file_names[key] = name
+    _pinned.add(name)
+    return name
+
+
+def collect_garbage(ttl_s: float = TTL_S) -> int:
+    """Delete unpinned media not written or reused within ``ttl_s``."""
+    cutoff = time.time() - ttl_s
+    removed = 0
+    for p in MEDIA_DIR.glob("*"):
+        if p.name in _pinned:
+            continue
+        try:
+            if p.stat().st_mtime < cutoff:
+                p.unlink()
+                removed += 1
+        except OSError:
+            continue
+    if removed:
+        logger.info("Media GC removed %d files", removed)
+    return removed
+
+
+def _gc_loop() -> None:
+    while True:
+        time.sleep(GC_INTERVAL_S)
+        try:
+            collect_garbage()
+        except Exception as exc:
+            logger.warning("Media GC failed: %s", exc)
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# Live streams
+# ═══════════════════════════════════════════════════════════════════════════
+
+class LiveStream:
+    """Media still being produced upstream, buffered so any reader can start from byte 0."""
+
+    def __init__(self, ext: str):
+        self.id = uuid.uuid4().hex
+        self.ext = ext.lstrip(".").lower()
+        self.created_at = time.time()
+        self.name: str | None = None  # content-addressed file once complete
+        self._cond = threading.Condition()
+        self._chunks: list[bytes] = []
+        self._finished = False
+        self._cancelled = threading.Event()
+        self.error: BaseException | None = None
+
+    @property
+    def src(self) -> str:
+        return f"{public_base_url()}{LIVE_PREFIX}{self.id}.{self.ext}"
+
+    def _produce(self, chunks: Iterable[bytes]) -> None:
+        it = iter(chunks)
+        try:
+            for chunk in it:
+                if self._cancelled.is_set():
+                    break
+                if chunk:
+                    with self._cond:
+                        self._chunks.append(chunk)
+                        self._cond.notify_all()
+        except Exception as exc:
+            self.error = exc
+            logger.warning("Live stream %s failed: %s", self.id[:8], exc)
+        finally:
+            close = getattr(it, "close", None)
+            if close:
+                close()
+            if self.error is None and not self._cancelled.is_set() and self._chunks:
+                self.name = put(b"".join(self._chunks), self.ext)
+            with self._cond:
+                self._finished = True
+                self._cond.notify_all()
+
+    def wait_started(self, timeout: float | None = None) -> bool:
+        """Block until the first chunk is in (True) or the stream ended or timed out empty (False)."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._chunks or self._finished, timeout)
+            return bool(self._chunks) and self.error is None
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+    def result(self, timeout: float | None = None) -> bytes | None:
+        """The complete bytes once the stream finishes, or None if it failed or was cancelled."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._finished, timeout):
+                return None
+            if self.error is not None or self._cancelled.is_set():
+                return None
+            return b"".join(self._chunks) or None
+
+    def iter_chunks(self) -> Iterator[bytes]:
+        """Every chunk from the start, blocking for new ones until the stream ends."""
+        i = 0
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: i < len(self._chunks) or self._finished)
+                new, finished = self._chunks[i:], self._finished
+            yield from new
+            i += len(new)
+            if finished and i >= len(self._chunks):
+                return
+
+
+def open_stream(chunks: Iterable[bytes], ext: str) -> LiveStream | None:
+    """Start draining ``chunks`` in the background and serve them at ``LiveStream.src``.
+
+    Returns None when the media server isn't running (callers should
+    collect the bytes and use ``media_src`` instead).
+    """
+    if not ensure_server():
+        return None
+    live = LiveStream(ext)
+    cutoff = time.time() - LIVE_TTL_S
+    with _lock:
+        for stream_id in [k for k, v in _live.items() if v.created_at < cutoff]:
+            del _live[stream_id]
+        _live[live.id] = live
+    threading.Thread(target=live._produce, args=(chunks,), name="live-stream", daemon=True).start()
+    return live
+
+
+def ttfs_url(turn_id: str) -> str | None:
+    """Where the browser reports time-to-first-sound for ``turn_id`` (None without the server)."""
+    if not ensure_server():
+        return None
+    return f"{public_base_url()}{TTFS_PATH}?turn={quote(turn_id)}"
+
+
+def record_ttfs(turn_id: str, seconds: float) -> None:
+    with _lock:
+        _ttfs[turn_id] = seconds
+        while len(_ttfs) > 500:
+            _ttfs.popitem(last=False)
+    latency_stats.record("turn.ttfs", seconds)
+    logger.info("Turn %s: first sound after %.2fs", turn_id, seconds)
+
+
+def turn_ttfs(turn_id: str) -> float | None:
+    with _lock:
+        return _ttfs.get(turn_id)
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# HTTP server
+# ═══════════════════════════════════════════════════════════════════════════
+
+class _MediaHandler(BaseHTTPRequestHandler):
+    server_version = "EXLMedia/1.0"
+
+    def log_message(self, fmt, *args):  # route access logs through logging
+        logger.debug("media %s - " + fmt, self.address_string(), *args)
+
+    def _send_common_headers(self, name: str) -> None:
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.send_header("Cache-Control", "public, max-age=31536000, immutable")
+        self.send_header("ETag", f'"{name.split(".")[0]}"')
+        self.send_header("Accept-Ranges", "bytes")
+
+    def do_HEAD(self):
+        self.do_GET(head_only=True)
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        if url.path != TTFS_PATH:
+            self.send_error(404)
+            return
+        query = parse_qs(url.query)
+        try:
+            turn_id = query["turn"][0][:64]
+            seconds = float(query["ms"][0]) / 1000
+        except (KeyError, IndexError, ValueError):
+            self.send_error(400)
+            return
+        if 0 <= seconds < 600:
+            record_ttfs(turn_id, seconds)
+        self.send_response(204)
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.end_headers()
+
+    def _serve_live(self, name: str, head_only: bool) -> None:
+        with _lock:
+            live = _live.get(name.split(".")[0])
+        if live is None:
+            self.send_error(404)
+            return
+        if live.name:  # complete: the stored file supports ranges and caching
+            self.send_response(302)
+            self.send_header("Location", f"{URL_PREFIX}{live.name}")
+            self.send_header("Access-Control-Allow-Origin", "*")
+            self.end_headers()
+            return
+        # Still arriving: send what we have and keep writing until it ends.
+        # HTTP/1.0 without Content-Length, so closing the socket ends the body.
+        self.send_response(200)
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.send_header("Cache-Control", "no-store")
+        self.send_header("Content-Type", mimetypes.guess_type(name)[0] or "application/octet-stream")
+        self.end_headers()
+        if head_only:
+            return
+        for chunk in live.iter_chunks():
+            try:
+                self.wfile.write(chunk)
+                self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                return
+
+    def do_GET(self, head_only: bool = False):
+        name = self.path.split("?", 1)[0]
+        if name.startswith(LIVE_PREFIX) and _NAME_RE.match(name[len(LIVE_PREFIX):]):
+            self._serve_live(name[len(LIVE_PREFIX):], head_only)
+            return
+        if not name.startswith(URL_PREFIX) or not _NAME_RE.match(name[len(URL_PREFIX):]):
+            self.send_error(404)
+            return
+        name = name[len(URL_PREFIX):]
+        path = MEDIA_DIR / name
+        try:
+            size = path.stat().st_size
+        except OSError:
+            self.send_error(404)
+            return
+
+        if self.headers.get("If-None-Match", "").strip('"') == name.split(".")[0]:
+            self.send_response(304)
+            self._send_common_headers(name)
+            self.end_headers()
+            return
+
+        start, end = 0, size - 1
+        status = 200
+        m = re.match(r"bytes=(\d*)-(\d*)$", self.headers.get("Range", ""))
+        if m and (m.group(1) or m.group(2)):
+            if m.group(1):
+                start = int(m.group(1))
+                end = min(int(m.group(2)), size - 1) if m.group(2) else size - 1
+            else:  # suffix range: last N bytes
+                start = max(size - int(m.group(2)), 0)
+            if start > end:
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{size}")
+                self.end_headers()
+                return
+            status = 206
+
+        self.send_response(status)
+        self._send_common_headers(name)
+        self.send_header("Content-Type", mimetypes.guess_type(name)[0] or "application/octet-stream")
+        self.send_header("Content-Length", str(end - start + 1))
+        if status == 206:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        self.end_headers()
+        if head_only:
+            return
+        with open(path, "rb") as f:
+            f.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = f.read(min(64 * 1024, remaining))
+                if not chunk:
+                    break
+                try:
+                    self.wfile.write(chunk)
+                except (BrokenPipeError, ConnectionResetError):
+                    return
+                remaining -= len(chunk)
+
+
+def ensure_server() -> bool:
+    """Start the media server thread once per process. Returns True if serving."""
+    with _lock:
+        if _server_state["started"]:
+            return _server_state["ok"]
+        _server_state["started"] = True
+        if SERVER_PORT <= 0:
+            return False
+        MEDIA_DIR.mkdir(parents=True, exist_ok=True)
+        try:
+            httpd = ThreadingHTTPServer(("0.0.0.0", SERVER_PORT), _MediaHandler)
+        except OSError as exc:
+            # Nothing is known to serve this port for us; fall back to data URIs.
+            logger.warning("Media server port %d unavailable (%s); using data URIs", SERVER_PORT, exc)
+            return False
+        httpd.daemon_threads = True
+        threading.Thread(target=httpd.serve_forever, name="media-server", daemon=True).start()
+        threading.Thread(target=_gc_loop, name="media-gc", daemon=True).start()
+        _server_state["ok"] = True
+        logger.info("Media server listening on :%d (%s)", SERVER_PORT, MEDIA_DIR)
+        return True
+
+
+def public_base_url() -> str:
+    base = os.environ.get("MEDIA_PUBLIC_URL", "").rstrip("/")
+    if base:
+        return base
+    # The app's Host header is only visible from a script thread; worker
+    # threads (lip-sync jobs, warmers) reuse the last one seen.
+    try:
+        import streamlit as st
+        host = st.context.headers.get("Host")
+        if host:
+            _last_host["host"] = host.rsplit(":", 1)[0]
+    except Exception:
+        pass
+    return f"http://{_last_host['host']}:{SERVER_PORT}"
+
+
+def url_for(name: str) -> str:
+    return f"{public_base_url()}{URL_PREFIX}{name}"
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# Browser-facing helpers — URL when serving, data URI otherwise
+# ═══════════════════════════════════════════════════════════════════════════
+
+def media_src(data: bytes | None, ext: str) -> str | None:
+    """Browser ``src`` for generated bytes (audio clip, video, image)."""
+    if not data:
+        return None
+    if ensure_server():
+        return url_for(put(data, ext))
+    mime = mimetypes.guess_type(f"x.{ext.lstrip('.')}")[0] or "application/octet-stream"
+    return f"data:{mime};base64,{base64.b64encode(data).decode()}"
+
+
+def read_src(src: str | None) -> bytes | None:
+    """Bytes behind a ``src`` this module produced (media URL or data URI), else None."""
+    if not src:
+        return None
+    if src.startswith("data:"):
+        return base64.b64decode(src.split(",", 1)[1])
+    name = src.rsplit(URL_PREFIX, 1)[-1] if URL_PREFIX in src else ""
+    if _NAME_RE.match(name):
+        try:
+            return (MEDIA_DIR / name).read_bytes()
+        except OSError:
+            return None
+    return None
+
+
+def file_src(path: str | None, size: int | None = None) -> str:
+    """Browser ``src`` for a static file on disk, or "" if it doesn't exist.
+
+    With ``size``, images are served as a WebP variant downscaled to fit
+    ``size`` pixels (pass the display size times the target pixel ratio).
+    """
+    if not path or not Path(path).exists():
+        return ""
+    if size:
+        variant = get_image_variant(path, size)
+        if variant:
+            return media_src(variant, "webp")
+    if ensure_server():
+        name = put_file(path)
+        if name:
+            return url_for(name)
+    mime = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    return f"data:{mime};base64,{get_image_base64(path)}"
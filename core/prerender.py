@@ -0,0 +1,193 @@
+"""Pre-render scenario answers, audio and lip-sync videos into the response bank.
+
+Run the night before an event so the booth serves scenario clicks from disk
+instead of paying for Gemini, TTS and lip-sync while the queue is forming:
+
+    python -m core.prerender                      # fill every empty slot
+    python -m core.prerender --leaders anil --variants 2 --concurrency 4
+    python -m core.prerender --refresh            # regenerate stale variants too
+
+Every (leader, scenario, slot) is checkpointed into the bank as soon as its
+text and audio exist, and again once its video is rendered, so an
+interrupted run picks up where it stopped. When any worker hits a rate
+limit, all workers back off together. The manifest the app loads at startup
+is rewritten periodically and at the end.
+"""
+
+import argparse
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from core import lipsync_jobs, prompt_registry, response_bank, voice_client
+from core.llm_client import get_leader_response
+from core.personality_engine import load_all_leaders
+from utils.helpers import clean_tts_text, get_scenarios
+
+logger = logging.getLogger("prerender")
+
+MAX_ATTEMPTS = 5
+BACKOFF_BASE_S = 5.0
+BACKOFF_MAX_S = 120.0
+MANIFEST_EVERY = 10
+
+
+class RateLimitGate:
+    """Shared pause: once any worker is rate-limited, every worker waits it out."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._until = 0.0
+
+    def wait(self) -> None:
+        while (delay := self._until - time.monotonic()) > 0:
+            time.sleep(delay)
+
+    def hit(self, attempt: int) -> float:
+        delay = min(BACKOFF_BASE_S * 2 ** attempt, BACKOFF_MAX_S) * random.uniform(0.8, 1.2)
+        with self._lock:
+            self._until = max(self._until, time.monotonic() + delay)
+        return delay
+
+
+def is_rate_limited(exc: Exception) -> bool:
+    text = str(exc).lower()
+    return getattr(exc, "code", None) == 429 or "429" in text or "resource_exhausted" in text or "rate limit" in text
+
+
+def _with_retries(gate: RateLimitGate, label: str, fn, *args):
+    for attempt in range(MAX_ATTEMPTS):
+        gate.wait()
+        try:
+            return fn(*args)
+        except Exception as exc:
+            if not is_rate_limited(exc) or attempt == MAX_ATTEMPTS - 1:
+                raise
+            logger.warning("%s rate-limited; backing off %.0fs", label, gate.hit(attempt))
+    return None
+
+
+def _synthesize_unhedged(leader: dict, text: str) -> bytes | None:
+    return voice_client.synthesize_for_leader(leader, text, hedge=False)
+
+
+def _render_video(audio: bytes, image_path: str) -> bytes | None:
+    # Same provider (LIPSYNC_PROVIDER) as the app, sharing any identical in-flight render.
+    return response_bank.fetch_video(lipsync_jobs.render(audio, image_path))
+
+
+def prerender_one(
+    leader: dict,
+    prompt: str,
+    slot: int,
+    gate: RateLimitGate,
+    video_slots: threading.Semaphore | None,
+    refresh: bool = False,
+) -> str:
+    """Produce or complete one bank slot. Returns a short status."""
+    with response_bank.claim_slot(leader["id"], prompt, slot) as claimed:
+        if not claimed:
+            return "skipped (another process is on it)"
+        return _prerender_slot(leader, prompt, slot, gate, video_slots, refresh)
+
+
+def _prerender_slot(
+    leader: dict,
+    prompt: str,
+    slot: int,
+    gate: RateLimitGate,
+    video_slots: threading.Semaphore | None,
+    refresh: bool,
+) -> str:
+    existing = {v.slot: v for v in response_bank.variants(leader["id"], prompt)}.get(slot)
+    if existing and refresh and time.time() - existing.created_at > response_bank.REFRESH_S:
+        existing = None
+    if existing and (existing.video_path or video_slots is None):
+        return "skipped"
+
+    if existing:  # text and audio checkpointed earlier; only the video is missing
+        text = existing.text
+        with open(existing.audio_path, "rb") as f:
+            audio = f.read()
+    else:
+        system_prompt = prompt_registry.get(leader).text
+        text = (_with_retries(gate, "Gemini", get_leader_response, system_prompt, [], prompt) or "").strip()
+        if not text:
+            return "failed: empty reply"
+        # No hedging: a slow ElevenLabs moment mustn't leave an Edge voice in the bank.
+        audio = _with_retries(gate, "TTS", _synthesize_unhedged, leader, clean_tts_text(text))
+        if not audio:
+            return "failed: no audio"
+        voice_client.synthesize_user_text(clean_tts_text(prompt))  # warm the question's TTS cache
+        response_bank.store(leader["id"], prompt, slot, text, audio)
+
+    if video_slots is None:
+        return "audio"
+    with video_slots:
+        video = _with_retries(gate, "Lip-sync", _render_video, audio, leader.get("avatar_image", ""))
+    if not video:
+        return "audio (video failed)"
+    response_bank.store(leader["id"], prompt, slot, text, audio, video)
+    return "video"
+
+
+def plan(leaders: dict, variants: int) -> list[tuple[dict, str, int]]:
+    """Every (leader, scenario prompt, slot) to visit; finished slots are skipped cheaply."""
+    return [
+        (leader, item["prompt"], slot)
+        for leader in leaders.values()
+        for cat in get_scenarios()
+        for item in cat["items"]
+        for slot in range(variants)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--leaders", nargs="*", help="leader ids (default: all)")
+    parser.add_argument("--variants", type=int, default=response_bank.VARIANTS)
+    parser.add_argument("--concurrency", type=int, default=3, help="pairs processed in parallel")
+    parser.add_argument("--video-concurrency", type=int, default=2, help="lip-sync renders in parallel")
+    parser.add_argument("--no-video", action="store_true", help="text and audio only")
+    parser.add_argument("--refresh", action="store_true", help="also regenerate variants past the refresh age")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    leaders = load_all_leaders()
+    if args.leaders:
+        leaders = {k: v for k, v in leaders.items() if k in args.leaders}
+    with_video = not args.no_video and lipsync_jobs.provider() is not None
+    if not args.no_video and not with_video:
+        logger.warning("No lip-sync provider configured; rendering text and audio only")
+
+    work = plan(leaders, args.variants)
+    gate = RateLimitGate()
+    video_slots = threading.Semaphore(args.video_concurrency) if with_video else None
+    done = 0
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        futures = {
+            pool.submit(prerender_one, leader, prompt, slot, gate, video_slots, args.refresh): (leader["id"], prompt, slot)
+            for leader, prompt, slot in work
+        }
+        for future in as_completed(futures):
+            leader_id, prompt, slot = futures[future]
+            try:
+                status = future.result()
+            except Exception as exc:
+                status = f"failed: {exc}"
+            done += 1
+            if status != "skipped":
+                logger.info("[%d/%d] %s #%d %s — %s", done, len(work), leader_id, slot, prompt[:50], status)
+            if done % MANIFEST_EVERY == 0:
+                response_bank.write_manifest()
+
+    total = response_bank.write_manifest()
+    logger.info("Done in %.0fs; manifest lists %d variants (%s)", time.time() - start, total,
+                response_bank.MANIFEST_PATH)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Compiled leader system prompts.
+
+``build_system_prompt`` reformats the full template, and the chat screen
+needed it on every rerun. ``get`` compiles each distinct leader config once —
+keyed by a stable hash of the YAML dict — and returns the prompt text, its
+UTF-8 bytes and a precomputed token estimate. ``token_count`` lets the
+history budgeter and usage metrics look that estimate up from the prompt
+text alone.
+
+The registry is cleared whenever a file in ``config/leaders/`` is added,
+removed or modified (checked at most every couple of seconds).
+"""
+
+import hashlib
+import json
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from core.history import estimate_tokens
+from core.prompt_builder import build_system_prompt
+
+CONFIG_DIR = Path("config/leaders")
+CHECK_INTERVAL_S = 2.0
+
+
+@dataclass(frozen=True)
+class CompiledPrompt:
+    config_hash: str
+    text: str
+    data: bytes
+    token_count: int
+
+
+_lock = threading.Lock()
+_compiled: dict[str, CompiledPrompt] = {}
+_by_text: dict[str, CompiledPrompt] = {}
+_state = {"fingerprint": None, "checked_at": 0.0}
+
+
+def config_hash(leader_config: dict) -> str:
+    """Stable hash of a leader config (key order and YAML formatting don't matter)."""
+    canonical = json.dumps(leader_config, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+def config_fingerprint(config_dir: Path = CONFIG_DIR) -> tuple:
+    """(file name, mtime) for every leader YAML — changes whenever one does."""
+    try:
+        return tuple((p.name, p.stat().st_mtime_ns) for p in sorted(config_dir.glob("*.yaml")))
+    except OSError:
+        return ()
+
+
+def _check_config() -> None:
+    now = time.monotonic()
+    if now - _state["checked_at"] < CHECK_INTERVAL_S:
+        return
+    _state["checked_at"] = now
+    fingerprint = config_fingerprint()
+    if fingerprint != _state["fingerprint"]:
+        _state["fingerprint"] = fingerprint
+        _compiled.clear()
+        _by_text.clear()
+
+
+def get(leader_config: dict) -> CompiledPrompt:
+    """The compiled system prompt for this leader, built on first use."""
+    key = config_hash(leader_config)
+    with _lock:
+        _check_config()
+        compiled = _compiled.get(key)
+        if compiled is None:
+            text = build_system_prompt(leader_config)
+            compiled = CompiledPrompt(
+                config_hash=key,
+                text=text,
+                data=text.encode("utf-8"),
+                token_count=estimate_tokens(text),
+            )
+            _compiled[key] = compiled
+            _by_text[text] = compiled
+        return compiled
+
+
+def token_count(system_prompt: str) -> int:
+    """Token estimate for a prompt, precomputed when it came from ``get``."""
+    compiled = _by_text.get(system_prompt)
+    return compiled.token_count if compiled else estimate_tokens(system_prompt)
+
+
+def registry_stats() -> dict:
+    with _lock:
+        return {
+            "prompts": len(_compiled),
+            "bytes": sum(len(c.data) for c in _compiled.values()),
+            "tokens": sum(c.token_count for c in _compiled.values()),
+        }
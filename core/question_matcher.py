@@ -0,0 +1,161 @@
+"""Near-duplicate question matching per leader, fully local.
+
+Visitors type endless variants of the same few questions ("what's the most
+important leadership lesson you've learned?" / "most important lesson in
+leadership?"). Every answered first-turn question is added to a per-leader
+TF-IDF index; when a new question scores above the threshold against one
+already answered, the stored answer and its audio can be replayed instead
+of calling Gemini and TTS again.
+
+The index is in-process and incremental: adding a question updates the
+document frequencies in place, and queries only score questions that share
+at least one term with the new one.
+
+Environment:
+  QUESTION_MATCH             0 disables reuse (questions are still indexed)  (default 1)
+  QUESTION_MATCH_THRESHOLD   cosine similarity needed to reuse an answer     (default 0.8)
+  QUESTION_MATCH_MAX         questions kept per leader, oldest dropped first (default 2000)
+"""
+
+import logging
+import math
+import os
+import re
+import threading
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.environ.get("QUESTION_MATCH", "1") != "0"
+THRESHOLD = float(os.environ.get("QUESTION_MATCH_THRESHOLD", "0.8"))
+MAX_QUESTIONS = int(os.environ.get("QUESTION_MATCH_MAX", "2000"))
+DUPLICATE_SCORE = 0.97  # don't index a question that is already there
+
+_WORD = re.compile(r"[a-z0-9]+")
+_CONTRACTIONS = {"what's": "what is", "how's": "how is", "you've": "you have", "you're": "you are",
+                 "i'm": "i am", "don't": "do not", "can't": "can not", "won't": "will not",
+                 "it's": "it is", "that's": "that is", "let's": "let us"}
+# Personal pronouns are kept: "what is your name?" and "what is my name?" must not match.
+_STOPWORDS = set(
+    "a an the and or but of to in on at for with from by about as is are was were be been being "
+    "do does did have has had it its this that these those there "
+    "what which who whom how why when where would could should can will shall may might must "
+    "tell please any some so if then than just very really ever also"
+    .split()
+)
+
+
+@dataclass
+class Match:
+    question: str
+    answer: str
+    audio_name: str | None
+    score: float
+
+
+def terms(text: str) -> Counter:
+    """Normalized content words: contractions expanded, stopwords dropped, plurals folded."""
+    text = text.lower().replace("’", "'")
+    for short, full in _CONTRACTIONS.items():
+        text = text.replace(short, full)
+    words = [w for w in _WORD.findall(text) if w not in _STOPWORDS]
+    return Counter(w[:-1] if len(w) > 4 and w.endswith("s") and not w.endswith("ss") else w for w in words)
+
+
+class QuestionIndex:
+    """Incremental TF-IDF index over one leader's answered questions."""
+
+    def __init__(self, max_questions: int = MAX_QUESTIONS):
+        self.max_questions = max_questions
+        self._docs: OrderedDict[int, tuple[Counter, Match]] = OrderedDict()
+        self._postings: dict[str, set[int]] = {}
+        self._next_id = 0
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def _idf(self, term: str) -> float:
+        return math.log((len(self._docs) + 1) / (len(self._postings.get(term, ())) + 1)) + 1.0
+
+    def _vector(self, tf: Counter) -> dict[str, float]:
+        vec = {t: (1 + math.log(n)) * self._idf(t) for t, n in tf.items()}
+        norm = math.sqrt(sum(v * v for v in vec.values())) or 1.0
+        return {t: v / norm for t, v in vec.items()}
+
+    def best(self, question: str) -> Match | None:
+        tf = terms(question)
+        if not tf:
+            return None
+        candidates = set().union(*(self._postings.get(t, set()) for t in tf))
+        if not candidates:
+            return None
+        query = self._vector(tf)
+        best_score, best_match = 0.0, None
+        for doc_id in candidates:
+            doc_tf, match = self._docs[doc_id]
+            doc = self._vector(doc_tf)
+            score = sum(w * doc.get(t, 0.0) for t, w in query.items())
+            if score > best_score:
+                best_score, best_match = score, match
+        if best_match is None:
+            return None
+        return Match(best_match.question, best_match.answer, best_match.audio_name, best_score)
+
+    def add(self, question: str, answer: str, audio_name: str | None = None) -> None:
+        tf = terms(question)
+        if not tf:
+            return
+        existing = self.best(question)
+        if existing and existing.score >= DUPLICATE_SCORE:
+            return
+        doc_id = self._next_id
+        self._next_id += 1
+        self._docs[doc_id] = (tf, Match(question, answer, audio_name, 1.0))
+        for t in tf:
+            self._postings.setdefault(t, set()).add(doc_id)
+        while len(self._docs) > self.max_questions:
+            old_id, (old_tf, _) = self._docs.popitem(last=False)
+            for t in old_tf:
+                self._postings[t].discard(old_id)
+                if not self._postings[t]:
+                    del self._postings[t]
+
+
+_lock = threading.Lock()
+_indexes: dict[str, QuestionIndex] = {}
+_stats: Counter = Counter()
+
+
+def lookup(leader_id: str, question: str, threshold: float = THRESHOLD) -> Match | None:
+    """A previously answered question close enough to reuse, or None. Counted in the hit rate."""
+    with _lock:
+        index = _indexes.get(leader_id)
+        match = index.best(question) if index else None
+        _stats["lookups"] += 1
+        if not ENABLED or not match or match.score < threshold:
+            return None
+        _stats["hits"] += 1
+        hit_rate = _stats["hits"] / _stats["lookups"]
+    logger.info(
+        "Question match %.2f for %s: %r ~ %r (hit rate %.0f%%)",
+        match.score, leader_id, question[:60], match.question[:60], hit_rate * 100,
+    )
+    return match
+
+
+def remember(leader_id: str, question: str, answer: str, audio_name: str | None = None) -> None:
+    """Index an answered question so later near-duplicates can reuse it."""
+    with _lock:
+        _indexes.setdefault(leader_id, QuestionIndex()).add(question, answer, audio_name)
+
+
+def matcher_stats() -> dict:
+    with _lock:
+        lookups, hits = _stats["lookups"], _stats["hits"]
+        return {
+            "lookups": lookups,
+            "hits": hits,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "questions": {leader_id: len(index) for leader_id, index in _indexes.items()},
+        }
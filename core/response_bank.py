@@ -0,0 +1,372 @@
+"""Pre-generated answers to the scenario library, shared across visitors.
+
+The prompts in ``utils.helpers.SCENARIOS`` are fixed strings clicked by
+hundreds of visitors a day, and each click used to pay for a Gemini call,
+TTS and a lip-sync render. The bank keeps several variants per (leader,
+scenario) — text, audio and, when a lip-sync provider is configured, video —
+so a first-turn scenario click is answered instantly from disk.
+
+Layout on disk::
+
+    <RESPONSE_BANK_DIR>/manifest.json                            index loaded at startup
+    <RESPONSE_BANK_DIR>/<leader id>/<scenario key>/<slot>.json   text + metadata
+                                                  /<slot>.mp3    leader audio
+                                                  /<slot>.mp4    lip-sync video (optional)
+
+The manifest is written by the pre-render CLI (``python -m core.prerender``);
+without one the index is built by scanning the directory.
+
+The pre-render CLI is the normal way to fill the bank. Every slot costs
+Gemini, TTS and lip-sync calls, so the in-app background warmer (which fills
+missing slots one at a time and regenerates variants past the refresh age)
+is opt-in. Whoever generates a slot holds a lock file next to it, so the CLI
+and any number of app processes never work on the same slot at once.
+
+Environment:
+  RESPONSE_BANK               0 disables the bank                 (default 1)
+  RESPONSE_BANK_WARMER        1 fills the bank from the app too   (default 0)
+  RESPONSE_BANK_DIR           storage directory                   (default assets/cache/responses)
+  RESPONSE_BANK_VARIANTS      variants kept per leader/scenario   (default 3)
+  RESPONSE_BANK_REFRESH_HOURS regenerate variants older than this (default 72)
+"""
+
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import random
+import tempfile
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable
+
+import requests
+
+from core import lipsync_jobs, media_store, voice_client
+from core.llm_client import get_leader_response
+from utils.helpers import clean_tts_text
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.environ.get("RESPONSE_BANK", "1") != "0"
+WARMER_ENABLED = os.environ.get("RESPONSE_BANK_WARMER", "0") == "1"
+BANK_DIR = Path(os.environ.get("RESPONSE_BANK_DIR", "assets/cache/responses"))
+VARIANTS = int(os.environ.get("RESPONSE_BANK_VARIANTS", "3"))
+REFRESH_S = float(os.environ.get("RESPONSE_BANK_REFRESH_HOURS", "72")) * 3600
+MANIFEST_PATH = BANK_DIR / "manifest.json"
+MANIFEST_CHECK_S = 30.0
+WARM_PAUSE_S = 5.0        # between generated variants, to stay out of live traffic's way
+WARM_IDLE_S = 15 * 60     # between passes once everything is filled
+SLOT_LOCK_STALE_S = 30 * 60  # a lock older than this was left by a dead process
+
+_lock = threading.Lock()
+_warmer = {"started": False}
+_index: dict[tuple[str, str], dict[int, "BankedResponse"]] = {}
+_index_state = {"loaded": False, "manifest_mtime": None, "checked_at": 0.0}
+
+
+@dataclass
+class BankedResponse:
+    leader_id: str
+    scenario_key: str
+    slot: int
+    text: str
+    audio_path: str
+    video_path: str | None
+    created_at: float
+
+
+def scenario_key(prompt: str) -> str:
+    return hashlib.sha256(" ".join(prompt.split()).lower().encode("utf-8")).hexdigest()[:16]
+
+
+def _dir(leader_id: str, key: str) -> Path:
+    return BANK_DIR / leader_id / key
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def _read_variant(meta_path: Path) -> BankedResponse | None:
+    try:
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    audio = meta_path.with_suffix(".mp3")
+    video = meta_path.with_suffix(".mp4")
+    if not meta.get("text") or not audio.exists():
+        return None
+    return BankedResponse(
+        leader_id=meta_path.parent.parent.name,
+        scenario_key=meta_path.parent.name,
+        slot=int(meta_path.stem),
+        text=meta["text"],
+        audio_path=str(audio),
+        video_path=str(video) if video.exists() else None,
+        created_at=meta.get("created_at", meta_path.stat().st_mtime),
+    )
+
+
+def scan() -> list[BankedResponse]:
+    """Every complete variant on disk."""
+    found = (_read_variant(p) for p in sorted(BANK_DIR.glob("*/*/*.json")))
+    return [v for v in found if v]
+
+
+def _index_put(v: BankedResponse) -> None:
+    _index.setdefault((v.leader_id, v.scenario_key), {})[v.slot] = v
+
+
+def write_manifest(path: Path | None = None) -> int:
+    """Write the manifest of everything on disk; returns the number of variants.
+
+    Paths are relative to the bank directory so a bank rendered on one
+    machine can be copied to the booth machines as is.
+    """
+    path = path or MANIFEST_PATH
+    entries = []
+    for v in scan():
+        entry = asdict(v)
+        entry["audio_path"] = str(Path(v.audio_path).relative_to(BANK_DIR))
+        if v.video_path:
+            entry["video_path"] = str(Path(v.video_path).relative_to(BANK_DIR))
+        entries.append(entry)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    body = {"generated_at": time.time(), "variants": entries}
+    _write_atomic(path, json.dumps(body, ensure_ascii=False, indent=1).encode("utf-8"))
+    return len(entries)
+
+
+def load_manifest(path: Path | None = None) -> int:
+    """Load the bank index from the manifest (or a disk scan if there is none)."""
+    path = path or MANIFEST_PATH
+    try:
+        mtime = path.stat().st_mtime
+        entries = json.loads(path.read_text(encoding="utf-8"))["variants"]
+        loaded = []
+        for e in entries:
+            e["audio_path"] = str(BANK_DIR / e["audio_path"])
+            if e.get("video_path"):
+                e["video_path"] = str(BANK_DIR / e["video_path"])
+            loaded.append(BankedResponse(**e))
+    except (OSError, ValueError, KeyError, TypeError):
+        mtime, loaded = None, scan()
+    with _lock:
+        _index.clear()
+        for v in loaded:
+            _index_put(v)
+        _index_state.update(loaded=True, manifest_mtime=mtime, checked_at=time.monotonic())
+    logger.info("Response bank: %d variants loaded", len(loaded))
+    return len(loaded)
+
+
+def _ensure_index() -> None:
+    # Pick up a manifest rewritten by the pre-render CLI without a restart.
+    if _index_state["loaded"]:
+        if time.monotonic() - _index_state["checked_at"] < MANIFEST_CHECK_S:
+            return
+        _index_state["checked_at"] = time.monotonic()
+        try:
+            mtime = MANIFEST_PATH.stat().st_mtime
+        except OSError:
+            return
+        if mtime == _index_state["manifest_mtime"]:
+            return
+    load_manifest()
+
+
+def variants(leader_id: str, prompt: str) -> list[BankedResponse]:
+    """Complete variants (text and audio present) stored for this pair."""
+    _ensure_index()
+    with _lock:
+        slots = dict(_index.get((leader_id, scenario_key(prompt)), {}))
+    return [v for _, v in sorted(slots.items()) if Path(v.audio_path).exists()]
+
+
+def pick(leader_id: str, prompt: str) -> BankedResponse | None:
+    """A random stored variant for this leader and scenario prompt, or None."""
+    if not ENABLED:
+        return None
+    found = variants(leader_id, prompt)
+    return random.choice(found) if found else None
+
+
+def store(
+    leader_id: str,
+    prompt: str,
+    slot: int,
+    text: str,
+    audio: bytes,
+    video: bytes | None = None,
+) -> BankedResponse:
+    """Write (or overwrite) one variant. The JSON goes last so readers never see half a variant."""
+    directory = _dir(leader_id, scenario_key(prompt))
+    directory.mkdir(parents=True, exist_ok=True)
+    _write_atomic(directory / f"{slot}.mp3", audio)
+    video_path = directory / f"{slot}.mp4"
+    if video:
+        _write_atomic(video_path, video)
+    else:
+        video_path.unlink(missing_ok=True)
+    meta = {"prompt": prompt, "text": text, "created_at": time.time()}
+    _write_atomic(directory / f"{slot}.json", json.dumps(meta, ensure_ascii=False).encode("utf-8"))
+    banked = BankedResponse(
+        leader_id=leader_id,
+        scenario_key=directory.name,
+        slot=slot,
+        text=text,
+        audio_path=str(directory / f"{slot}.mp3"),
+        video_path=str(video_path) if video else None,
+        created_at=meta["created_at"],
+    )
+    _ensure_index()
+    with _lock:
+        _index_put(banked)
+    return banked
+
+
+def next_slot(leader_id: str, prompt: str) -> int | None:
+    """Slot the warmer should (re)generate next for this pair, or None if it's fresh.
+
+    Reads the disk rather than the index, so work done by another process
+    (the CLI, a sibling app process) is never repeated.
+    """
+    found = [v for v in map(_read_variant, _dir(leader_id, scenario_key(prompt)).glob("*.json")) if v]
+    used = {v.slot for v in found}
+    free = [s for s in range(VARIANTS) if s not in used]
+    if free:
+        return free[0]
+    oldest = min(found, key=lambda v: v.created_at)
+    return oldest.slot if time.time() - oldest.created_at > REFRESH_S else None
+
+
+@contextlib.contextmanager
+def claim_slot(leader_id: str, prompt: str, slot: int):
+    """Hold a slot's lock file while generating it; yields False if another process has it."""
+    directory = _dir(leader_id, scenario_key(prompt))
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{slot}.lock"
+    for _ in range(2):
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                stale = time.time() - path.stat().st_mtime > SLOT_LOCK_STALE_S
+            except OSError:
+                stale = False  # just released; leave the slot for the next pass
+            if not stale:
+                yield False
+                return
+            path.unlink(missing_ok=True)
+    else:
+        yield False
+        return
+    try:
+        yield True
+    finally:
+        os.close(fd)
+        path.unlink(missing_ok=True)
+
+
+def fetch_video(src: str | None) -> bytes | None:
+    """Bytes of a rendered lip-sync video, whether local or on a provider CDN."""
+    if not src:
+        return None
+    data = media_store.read_src(src)
+    if data is not None or not src.startswith("http"):
+        return data
+    try:
+        resp = requests.get(src, timeout=60)
+        resp.raise_for_status()
+        return resp.content
+    except Exception as exc:
+        logger.warning("Could not download lip-sync video: %s", exc)
+        return None
+
+
+def generate_variant(
+    leader: dict,
+    prompt: str,
+    slot: int,
+    system_prompt: str,
+) -> BankedResponse | None:
+    """Produce one variant end to end: reply, leader audio, then lip-sync if available."""
+    text = (get_leader_response(system_prompt, [], prompt) or "").strip()
+    if not text:
+        return None
+    # Unhedged: banked answers keep the cloned voice even when ElevenLabs is slow.
+    audio = voice_client.synthesize_for_leader(leader, clean_tts_text(text), hedge=False)
+    if not audio:
+        return None
+    video = fetch_video(lipsync_jobs.render(audio, leader.get("avatar_image", "")))
+    # The visitor's question is voiced too; this leaves it in the TTS cache.
+    voice_client.synthesize_user_text(clean_tts_text(prompt))
+    return store(leader["id"], prompt, slot, text, audio, video)
+
+
+def _warm_pass(leaders: dict, scenarios: list, system_prompt_for: Callable[[dict], str]) -> int:
+    made = 0
+    for leader in leaders.values():
+        for cat in scenarios:
+            for item in cat["items"]:
+                slot = next_slot(leader["id"], item["prompt"])
+                if slot is None:
+                    continue
+                with claim_slot(leader["id"], item["prompt"], slot) as claimed:
+                    # Re-checked under the lock: another process may have just filled it.
+                    if not claimed or next_slot(leader["id"], item["prompt"]) != slot:
+                        continue
+                    try:
+                        if generate_variant(leader, item["prompt"], slot, system_prompt_for(leader)):
+                            made += 1
+                    except Exception as exc:
+                        # Usually systemic (missing key, quota); try again next pass.
+                        logger.warning("Response bank warm-up stopped for this pass: %s", exc)
+                        return made
+                time.sleep(WARM_PAUSE_S)
+    return made
+
+
+def start_warmer(
+    leaders: dict,
+    scenarios: list,
+    system_prompt_for: Callable[[dict], str],
+) -> None:
+    """Start the background thread that keeps the bank filled (once per process, opt-in)."""
+    with _lock:
+        if not ENABLED or not WARMER_ENABLED or _warmer["started"]:
+            return
+        _warmer["started"] = True
+
+    def _loop():
+        while True:
+            made = _warm_pass(leaders, scenarios, system_prompt_for)
+            if made:
+                write_manifest()
+                logger.info("Response bank: generated %d variants", made)
+            time.sleep(WARM_IDLE_S)
+
+    threading.Thread(target=_loop, name="response-bank-warmer", daemon=True).start()
+
+
+def bank_stats() -> dict:
+    _ensure_index()
+    with _lock:
+        found = [v for slots in _index.values() for v in slots.values()]
+    return {
+        "variants": len(found),
+        "videos": sum(1 for v in found if v.video_path),
+        "scenarios": len(_index),
+    }
@@ -0,0 +1,187 @@
+"""Single-flight deduplication of identical in-flight calls.
+
+When several kiosks fire the same scenario at the same moment, each
+Streamlit session would otherwise send its own identical Gemini, TTS or
+lip-sync request. Calls wrapped here are keyed; while one is in flight,
+later callers with the same key wait for it and share its result (or its
+exception) instead of going upstream again. Once it finishes the key is
+released, so the next call after that is a fresh one — results are not
+cached here.
+
+``do`` coalesces a blocking call; ``stream`` coalesces a generator, with
+every caller receiving the full sequence of chunks from the start.
+``do_cancellable`` coalesces a call that can be stopped upstream: it is
+stopped only once every caller sharing it has given up.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+from collections import Counter
+from typing import Callable, Hashable, Iterable, Iterator, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_lock = threading.Lock()
+_calls: dict[Hashable, "_Call"] = {}
+_streams: dict[Hashable, "_Stream"] = {}
+_stats: Counter = Counter()
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: BaseException | None = None
+        self.waiters = 0
+        self.cancel = threading.Event()  # set once every waiter has cancelled
+
+
+class _Stream:
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.chunks: list = []
+        self.finished = False
+        self.error: BaseException | None = None
+
+
+def key(*parts) -> str:
+    """Stable key for arbitrary call arguments; bytes are hashed, not serialized."""
+    def _norm(p):
+        if isinstance(p, (bytes, bytearray)):
+            return "sha256:" + hashlib.sha256(p).hexdigest()
+        return p
+    raw = json.dumps([_norm(p) for p in parts], sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def do(call_key: Hashable, fn: Callable[[], T]) -> T:
+    """Run ``fn`` unless an identical call is in flight, in which case share its outcome."""
+    with _lock:
+        call = _calls.get(call_key)
+        leader = call is None
+        if leader:
+            call = _calls[call_key] = _Call()
+            _stats["calls"] += 1
+        else:
+            _stats["shared"] += 1
+    if not leader:
+        call.done.wait()
+        if call.error is not None:
+            raise call.error
+        return call.result
+    try:
+        call.result = fn()
+        return call.result
+    except BaseException as exc:
+        call.error = exc
+        raise
+    finally:
+        with _lock:
+            if _calls.get(call_key) is call:
+                del _calls[call_key]
+        call.done.set()
+
+
+def _run(call_key: Hashable, call: _Call, fn: Callable[[threading.Event], T]) -> None:
+    try:
+        call.result = fn(call.cancel)
+    except BaseException as exc:
+        call.error = exc
+    finally:
+        with _lock:
+            if _calls.get(call_key) is call:
+                del _calls[call_key]
+        call.done.set()
+
+
+def do_cancellable(
+    call_key: Hashable,
+    fn: Callable[[threading.Event], T],
+    cancel: threading.Event | None = None,
+) -> T | None:
+    """Like ``do``, for calls that can be stopped upstream.
+
+    ``fn`` runs on its own thread and receives an event that is set only
+    once every caller sharing the flight has cancelled, so one caller giving
+    up doesn't abort the call for the others. A caller whose ``cancel`` is
+    set stops waiting and gets None; callers without one never cancel.
+    """
+    with _lock:
+        call = _calls.get(call_key)
+        start = call is None or call.cancel.is_set()  # abandoned flights aren't joined
+        if start:
+            call = _calls[call_key] = _Call()
+            _stats["calls"] += 1
+        else:
+            _stats["shared"] += 1
+        call.waiters += 1
+    if start:
+        threading.Thread(target=_run, args=(call_key, call, fn), name="single-flight", daemon=True).start()
+    while not call.done.wait(0.1 if cancel is not None else None):
+        if cancel.is_set():
+            with _lock:
+                call.waiters -= 1
+                if not call.waiters:
+                    call.cancel.set()
+            return None
+    if call.error is not None:
+        raise call.error
+    return call.result
+
+
+def _produce(stream_key: Hashable, flight: _Stream, fn: Callable[[], Iterable]) -> None:
+    try:
+        for chunk in fn():
+            with flight.cond:
+                flight.chunks.append(chunk)
+                flight.cond.notify_all()
+    except BaseException as exc:
+        flight.error = exc
+    finally:
+        with _lock:
+            _streams.pop(stream_key, None)
+        with flight.cond:
+            flight.finished = True
+            flight.cond.notify_all()
+
+
+def stream(stream_key: Hashable, fn: Callable[[], Iterable[T]]) -> Iterator[T]:
+    """Iterate ``fn()`` once for all concurrent callers with the same key.
+
+    The upstream generator runs on its own thread, so a caller that stops
+    early doesn't cut the stream short for the others.
+    """
+    with _lock:
+        flight = _streams.get(stream_key)
+        start = flight is None
+        if start:
+            flight = _streams[stream_key] = _Stream()
+            _stats["streams"] += 1
+        else:
+            _stats["shared_streams"] += 1
+    if start:
+        threading.Thread(
+            target=_produce, args=(stream_key, flight, fn), name="single-flight", daemon=True
+        ).start()
+
+    i = 0
+    while True:
+        with flight.cond:
+            while i >= len(flight.chunks) and not flight.finished:
+                flight.cond.wait()
+            new, finished, error = flight.chunks[i:], flight.finished, flight.error
+        yield from new
+        i += len(new)
+        if finished:
+            if error is not None:
+                raise error
+            return
+
+
+def flight_stats() -> dict:
+    with _lock:
+        return {**_stats, "in_flight": len(_calls) + len(_streams)}
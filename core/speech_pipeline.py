@@ -0,0 +1,216 @@
+"""Sentence-pipelined leader speech.
+
+Splits the streamed Gemini reply at sentence boundaries and hands each
+sentence to TTS while the model is still writing the next one, so the first
+audio segment is ready long before the full reply is.
+
+    for item in stream_leader_speech(leader, prompt, history, question):
+        if isinstance(item, str):      # text delta — append to the chat bubble
+            ...
+        else:                          # SpeechSegment — queue its audio
+            ...
+
+With the media server running and an ElevenLabs voice, leader sentences
+are *streamed*: a segment is yielded as soon as its first audio chunk
+arrives, carrying a live ``src`` the browser plays while the rest of the
+sentence is still being generated. Its ``audio`` is filled in before the
+generator finishes, so ``join_audio`` still sees every byte.
+
+Environment:
+  TTS_STREAMING   0 waits for each sentence's full clip instead of streaming (default 1)
+"""
+
+import logging
+import os
+import re
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Iterator
+
+from core import media_store, voice_client
+from core.llm_client import stream_leader_response
+
+logger = logging.getLogger(__name__)
+
+# A sentence ends at . ! ? or … (optionally followed by closing quotes or
+# brackets) plus whitespace, or at a blank line between paragraphs.
+_SENTENCE_END = re.compile(r"(?<=[.!?…])[\"')\]]*\s+|\n\s*\n")
+
+# Fragments shorter than this ("Look.") are merged into the following
+# sentence so TTS isn't called for a single word.
+MIN_SENTENCE_CHARS = 24
+
+STREAMING = os.environ.get("TTS_STREAMING", "1") != "0"
+STREAM_RESULT_TIMEOUT_S = 60
+STREAM_START_TIMEOUT_S = 15  # unhedged sentences: how long a stream may take to start
+
+_executor = ThreadPoolExecutor(max_workers=6, thread_name_prefix="tts-pipeline")
+
+
+@dataclass
+class SpeechSegment:
+    """One synthesized piece of the turn: the user's question or a sentence of the reply."""
+
+    index: int
+    text: str
+    audio: bytes | None
+    speaker: str = "leader"
+    src: str | None = None  # live stream URL; ``audio`` arrives when the stream ends
+
+
+def _timed(fn: Callable, *args) -> tuple[object, float]:
+    start = time.perf_counter()
+    try:
+        return fn(*args), time.perf_counter() - start
+    except Exception as exc:
+        logger.warning("%s failed: %s", getattr(fn, "__name__", fn), exc)
+        return None, time.perf_counter() - start
+
+
+def _leader_audio(
+    leader_config: dict,
+    text: str,
+    plan: voice_client.VoicePlan,
+    lead: bool,
+) -> bytes | media_store.LiveStream | None:
+    """A live stream once its first chunk is in, or the fully synthesized clip.
+
+    The ``lead`` (first) sentence may hedge: a stream that hasn't started by
+    the ElevenLabs hedge deadline (or failed) is dropped in favour of Edge
+    TTS, like ``synthesize_for_leader``. Its outcome decides ``plan``; later
+    sentences wait for that and keep the same voice.
+    """
+    if not lead:
+        plan.wait()
+        return _sentence_audio(leader_config, text, plan)
+    try:
+        return _sentence_audio(leader_config, text, plan)
+    finally:
+        plan.release()
+
+
+def _sentence_audio(
+    leader_config: dict,
+    text: str,
+    plan: voice_client.VoicePlan,
+) -> bytes | media_store.LiveStream | None:
+    hedge = plan.provider is None
+    chunks = None
+    if STREAMING and plan.provider != "edge":
+        chunks = voice_client.stream_for_leader(leader_config, text)
+    if chunks is None:
+        return voice_client.synthesize_for_leader(leader_config, text, hedge=hedge, plan=plan)
+    live = media_store.open_stream(chunks, "mp3")
+    if live is None:
+        chunks.close()
+        return voice_client.synthesize_for_leader(leader_config, text, hedge=hedge, plan=plan)
+    start_s = voice_client.hedge_deadline("elevenlabs.first_byte") if hedge else STREAM_START_TIMEOUT_S
+    if live.wait_started(start_s):
+        plan.decide("elevenlabs")
+        return live
+    live.cancel()
+    logger.info("ElevenLabs stream did not start in time; using Edge TTS")
+    edge_voice = leader_config.get("voice_id", "")
+    audio = voice_client.edge_synthesize(text, edge_voice) if edge_voice else None
+    if audio:
+        plan.decide("edge")
+    return audio
+
+
+def _find_boundary(buf: str, min_chars: int) -> int | None:
+    for m in _SENTENCE_END.finditer(buf):
+        if m.start() >= min_chars:
+            return m.end()
+    return None
+
+
+def stream_leader_speech(
+    leader_config: dict,
+    system_prompt: str,
+    conversation_history: list,
+    user_message: str,
+    clean: Callable[[str], str] | None = None,
+    user_text: str | None = None,
+    timings: dict | None = None,
+) -> Iterator[str | SpeechSegment]:
+    """Stream the leader's reply, synthesizing each sentence as it completes.
+
+    Yields text deltas (``str``) as soon as Gemini produces them, and
+    ``SpeechSegment`` objects strictly in order as their audio becomes ready.
+    If ``user_text`` is given, the question is voiced concurrently with the
+    model call and yielded first with ``speaker="user"``. ``clean`` turns a
+    markdown sentence into TTS-safe text. ``timings``, when passed, is filled
+    with seconds-from-start for each stage.
+    """
+    clean = clean or (lambda t: t)
+    timings = timings if timings is not None else {}
+    start = time.perf_counter()
+    pending: deque = deque()
+    streamed: list[tuple[SpeechSegment, media_store.LiveStream]] = []
+    buf = ""
+    index = 0
+    plan = voice_client.VoicePlan()
+    leader_span: list[float] = []  # first leader submission, then each completion
+
+    if user_text:
+        future = _executor.submit(_timed, voice_client.synthesize_user_text, user_text)
+        pending.append((-1, user_text, "user", future))
+
+    def _submit(sentence: str) -> None:
+        nonlocal index
+        future = _executor.submit(_timed, _leader_audio, leader_config, clean(sentence), plan, index == 0)
+        if not leader_span:
+            leader_span.append(time.perf_counter())
+        future.add_done_callback(lambda _: leader_span.append(time.perf_counter()))
+        pending.append((index, sentence, "leader", future))
+        index += 1
+
+    def _ready(block: bool) -> Iterator[SpeechSegment]:
+        while pending and (block or pending[0][3].done()):
+            i, text, speaker, future = pending.popleft()
+            audio, elapsed = future.result()
+            segment = SpeechSegment(index=i, text=text, audio=audio, speaker=speaker)
+            if isinstance(audio, media_store.LiveStream):
+                segment.audio, segment.src = None, audio.src
+                streamed.append((segment, audio))
+            if speaker == "user":
+                timings["user_tts"] = elapsed
+            else:
+                if audio and "first_leader_audio" not in timings:
+                    timings["first_leader_audio"] = time.perf_counter() - start
+            yield segment
+
+    for chunk in stream_leader_response(system_prompt, conversation_history, user_message):
+        timings.setdefault("first_token", time.perf_counter() - start)
+        yield chunk
+        buf += chunk
+        while (cut := _find_boundary(buf, MIN_SENTENCE_CHARS)) is not None:
+            sentence, buf = buf[:cut].strip(), buf[cut:]
+            if sentence:
+                _submit(sentence)
+        yield from _ready(block=False)
+
+    timings["llm"] = time.perf_counter() - start
+    if buf.strip():
+        _submit(buf.strip())
+    yield from _ready(block=True)
+    if len(leader_span) > 1:
+        # Wall clock from the first sentence sent to TTS to the last one done;
+        # sentences overlap, so their individual durations don't add up.
+        timings["leader_tts"] = max(leader_span[1:]) - leader_span[0]
+    for segment, live in streamed:
+        segment.audio = live.result(timeout=STREAM_RESULT_TIMEOUT_S)
+    timings["total"] = time.perf_counter() - start
+
+
+def leader_parts(segments: list[SpeechSegment]) -> list[bytes]:
+    """The leader's sentence MP3s in playing order."""
+    return [s.audio for s in segments if s.audio and s.speaker == "leader"]
+
+
+def join_audio(segments: list[SpeechSegment]) -> bytes | None:
+    """Concatenate leader segment MP3s into one clip (MP3 frames concatenate cleanly)."""
+    audio = b"".join(leader_parts(segments))
+    return audio or None
@@ -0,0 +1,183 @@
+"""Hosted URLs of files already uploaded to a provider, shared across processes and restarts.
+
+Lip-sync providers need the leader image as a URL they host, and the image
+never changes between turns. Uploads are recorded here by provider and
+SHA-256 of the file content, so a leader image is uploaded once per
+hosted-URL lifetime rather than once per talk, per process or per restart.
+Editing the image changes its hash and triggers a fresh upload.
+
+The registry is a small JSON file written atomically. While one process
+uploads a given file, others on the same host wait on a lock file and then
+reuse its URL. A provider may drop a hosted file before our TTL runs out;
+callers that get it refused pass the URL back as ``rejected`` and the file
+is uploaded afresh.
+
+Environment:
+  UPLOAD_REGISTRY_PATH   registry file                          (default assets/cache/uploads.json)
+  DID_UPLOAD_TTL_HOURS   how long a D-ID image URL is trusted   (default 24)
+  FAL_UPLOAD_TTL_HOURS   how long a FAL storage URL is trusted  (default 72)
+"""
+
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+REGISTRY_PATH = Path(os.environ.get("UPLOAD_REGISTRY_PATH", "assets/cache/uploads.json"))
+TTL_S = {
+    "did": float(os.environ.get("DID_UPLOAD_TTL_HOURS", "24")) * 3600,
+    "fal": float(os.environ.get("FAL_UPLOAD_TTL_HOURS", "72")) * 3600,
+}
+DEFAULT_TTL_S = 24 * 3600
+LOCK_STALE_S = 120.0
+# 4xx answers where the provider refused the request itself (e.g. a hosted
+# URL it no longer serves), as opposed to auth, credit or rate limits.
+REJECTED_CODES = {400, 404, 410, 422}
+
+_lock = threading.Lock()
+_key_locks: dict[str, threading.Lock] = {}
+_stats = {"hits": 0, "uploads": 0}
+
+
+def content_hash(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _key(provider: str, digest: str) -> str:
+    return f"{provider}:{digest}"
+
+
+def _load() -> dict:
+    try:
+        return json.loads(REGISTRY_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def _save(entries: dict) -> None:
+    REGISTRY_PATH.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=REGISTRY_PATH.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(entries, f, indent=1)
+        os.replace(tmp, REGISTRY_PATH)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def lookup(provider: str, digest: str) -> str | None:
+    """The hosted URL for this content if it was uploaded within the provider's TTL."""
+    entry = _load().get(_key(provider, digest))
+    if not entry or time.time() - entry["uploaded_at"] > TTL_S.get(provider, DEFAULT_TTL_S):
+        return None
+    return entry["url"]
+
+
+def register(provider: str, digest: str, url: str) -> None:
+    with _lock, _host_lock("registry"):
+        entries = _load()
+        entries[_key(provider, digest)] = {"url": url, "uploaded_at": time.time()}
+        _save(entries)
+
+
+def invalidate(provider: str, digest: str, url: str | None = None) -> None:
+    """Forget a URL the provider no longer accepts, so the next call re-uploads.
+
+    With ``url``, the entry is dropped only if it still holds that URL (another
+    process may already have replaced it).
+    """
+    with _lock, _host_lock("registry"):
+        entries = _load()
+        entry = entries.get(_key(provider, digest))
+        if entry and (url is None or entry["url"] == url):
+            del entries[_key(provider, digest)]
+            _save(entries)
+
+
+def is_rejection(exc: BaseException) -> bool:
+    """True if a provider call failed with a 4xx that a fresh upload may fix."""
+    while exc is not None:
+        status = getattr(exc, "status_code", None)
+        if status is None:
+            status = getattr(getattr(exc, "response", None), "status_code", None)
+        if status is not None:
+            return status in REJECTED_CODES
+        exc = exc.__cause__
+    return False
+
+
+@contextlib.contextmanager
+def _host_lock(name: str):
+    """Best-effort lock between processes on one host (an O_EXCL lock file)."""
+    path = REGISTRY_PATH.parent / f".lock-{name}"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    while True:
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - path.stat().st_mtime > LOCK_STALE_S:
+                    path.unlink(missing_ok=True)  # holder died mid-upload
+                    continue
+            except OSError:
+                continue
+            time.sleep(0.2)
+    try:
+        yield
+    finally:
+        os.close(fd)
+        path.unlink(missing_ok=True)
+
+
+def get_or_upload(
+    provider: str,
+    path: str,
+    upload: Callable[[], str | None],
+    rejected: str | None = None,
+) -> str | None:
+    """Hosted URL for the file at ``path``, calling ``upload`` only if none is registered.
+
+    ``rejected`` is a URL the provider just refused; it is forgotten first.
+    """
+    digest = content_hash(path)
+    if rejected:
+        invalidate(provider, digest, rejected)
+    url = lookup(provider, digest)
+    if url:
+        with _lock:
+            _stats["hits"] += 1
+        return url
+    with _lock:
+        key_lock = _key_locks.setdefault(_key(provider, digest), threading.Lock())
+    with key_lock, _host_lock(f"{provider}-{digest[:16]}"):
+        url = lookup(provider, digest)  # uploaded while we waited
+        if url:
+            with _lock:
+                _stats["hits"] += 1
+            return url
+        url = upload()
+        if url:
+            register(provider, digest, url)
+            with _lock:
+                _stats["uploads"] += 1
+            logger.info("Uploaded %s to %s: %s", path, provider, url)
+    return url
+
+
+def registry_stats() -> dict:
+    with _lock:
+        return dict(_stats)
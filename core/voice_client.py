@@ -9,6 +9,23 @@ Each leader YAML has two voice-related fields:
   voice_id:     Microsoft Neural voice name (e.g. "en-IN-PrabhatNeural")
                 Used by Edge TTS — always free.
   voice_sample: path to an audio clip for ElevenLabs cloning (optional).
+
+Hedging: a slow ElevenLabs request no longer stalls the reply. If no first
+byte has arrived by the hedge deadline, Edge TTS starts in parallel and the
+first usable result wins; the loser is cancelled (unless another session is
+waiting on the same in-flight synthesis). Edge's own fallback voices are
+hedged the same way. Deadlines track the p95 of recent upstream latencies
+(see core.latency_stats), clamped to a sane range.
+
+Hedging is for live replies only: batch callers pass ``hedge=False`` so the
+response bank keeps the cloned voice, and a ``VoicePlan`` keeps every
+sentence of one reply in the voice its first sentence ended up with.
+
+Environment:
+  TTS_HEDGE             0 disables hedging (strict sequential fallback)   (default 1)
+  TTS_HEDGE_DEADLINE_S  fixed ElevenLabs first-byte deadline, 0 = auto    (default 0)
+  TTS_HEDGE_MIN_S       lower clamp for the automatic deadlines          (default 0.4)
+  TTS_HEDGE_MAX_S       upper clamp for the automatic deadlines          (default 4)
 """
 
 import asyncio
@@ -16,12 +33,16 @@ import io
 import json
 import logging
 import os
-import base64
+import threading
 import time
 import streamlit as st
+from collections.abc import Iterator
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeout
 from pathlib import Path
 
-import requests
+from core import audio_cache, did_poller, http_sessions, latency_stats, loop_service, single_flight, upload_registry
+from utils.helpers import mp3_duration_s
 
 try:
     import fal_client
@@ -35,6 +56,46 @@ EDGE_FALLBACK_VOICES = (
     "en-IN-PrabhatNeural",
     "en-US-GuyNeural",
 )
+EDGE_TIMEOUT_S = 20
+
+HEDGE_ENABLED = os.environ.get("TTS_HEDGE", "1") != "0"
+HEDGE_DEADLINE_S = float(os.environ.get("TTS_HEDGE_DEADLINE_S", "0"))
+HEDGE_MIN_S = float(os.environ.get("TTS_HEDGE_MIN_S", "0.4"))
+HEDGE_MAX_S = float(os.environ.get("TTS_HEDGE_MAX_S", "4"))
+HEDGE_MIN_SAMPLES = 20  # below this, the defaults below are used instead of p95
+HEDGE_DEFAULTS_S = {"elevenlabs.first_byte": 1.5, "edge.total": 3.0}
+
+# Separate pools: provider calls hedge Edge voices on their own pool, so a
+# busy provider pool can never deadlock waiting on itself.
+_provider_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="tts-hedge")
+_voice_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="tts-voice")
+_hedge_stats = {"hedged": 0, "primary_won": 0, "hedge_won": 0}
+_hedge_lock = threading.Lock()
+
+
+def hedge_deadline(metric: str) -> float:
+    """Seconds to wait on ``metric`` before hedging: its p95, clamped."""
+    if metric == "elevenlabs.first_byte" and HEDGE_DEADLINE_S > 0:
+        return HEDGE_DEADLINE_S
+    p95 = latency_stats.percentile(metric, 95, min_samples=HEDGE_MIN_SAMPLES)
+    if p95 is None:
+        return HEDGE_DEFAULTS_S[metric]
+    return min(max(p95, HEDGE_MIN_S), HEDGE_MAX_S)
+
+
+def _count(stat: str) -> None:
+    with _hedge_lock:
+        _hedge_stats[stat] += 1
+
+
+def tts_latency_stats() -> dict:
+    with _hedge_lock:
+        hedging = dict(_hedge_stats)
+    return {
+        "hedging": hedging,
+        "deadlines": {m: hedge_deadline(m) for m in HEDGE_DEFAULTS_S},
+        "latency": latency_stats.snapshot(),
+    }
 
 # ═══════════════════════════════════════════════════════════════════════════
 # Edge TTS  (FREE — no API key required)
@@ -58,10 +119,12 @@ async def _edge_synthesize_async(text: str, voice: str) -> bytes:
     return buf.getvalue()
 
 
-def edge_synthesize(text: str, voice: str) -> bytes | None:
+def edge_synthesize(text: str, voice: str, cancel: threading.Event | None = None) -> bytes | None:
     """Synthesize speech using free Microsoft Edge Neural TTS.
 
-    Returns MP3 bytes, or None on failure.
+    The requested voice goes first; a fallback voice is started alongside it
+    if it fails or runs past the hedge deadline. Setting ``cancel`` abandons
+    whatever is still running. Returns MP3 bytes, or None on failure.
     """
     if not _edge_tts_available():
         logger.warning("edge-tts not installed — pip install edge-tts")
@@ -74,17 +137,71 @@ def edge_synthesize(text: str, voice: str) -> bytes | None:
     candidates = [voice] if voice else []
     candidates.extend(v for v in EDGE_FALLBACK_VOICES if v and v != voice)
 
-    for candidate in candidates:
-        loop = asyncio.new_event_loop()
-        try:
-            audio = loop.run_until_complete(_edge_synthesize_async(clean_text, candidate))
+    cancel = cancel or threading.Event()
+    if not HEDGE_ENABLED:
+        for candidate in candidates:
+            audio = _edge_cached(clean_text, candidate, cancel)
+            if audio:
+                return audio
+        return None
+
+    remaining = list(candidates)
+    running: dict = {}
+
+    def _launch():
+        v = remaining.pop(0)
+        running[_voice_pool.submit(_edge_cached, clean_text, v, cancel)] = v
+
+    _launch()
+    deadline = hedge_deadline("edge.total")
+    while running and not cancel.is_set():
+        done, _ = wait(running, timeout=deadline if remaining else None, return_when=FIRST_COMPLETED)
+        if not done:
+            logger.info("Edge TTS voice %s slow (>%.1fs); hedging", next(iter(running.values())), deadline)
+            _count("hedged")
+            _launch()
+            continue
+        for future in done:
+            running.pop(future)
+            audio = future.result()
             if audio:
-                logger.info("Edge TTS: %d bytes, voice=%s", len(audio), candidate)
+                if running:
+                    cancel.set()  # stop the voices still in flight
                 return audio
-        except Exception as exc:
-            logger.warning("Edge TTS failed for voice %s: %s", candidate, exc)
-        finally:
-            loop.close()
+            if remaining:
+                _launch()  # failed outright: move on without waiting for the deadline
+    return None
+
+
+def _edge_cached(text: str, voice: str, cancel: threading.Event) -> bytes | None:
+    return audio_cache.cached_synthesize(
+        "edge", voice, text[:3000], None,
+        lambda shared_cancel: _edge_synthesize_once(text, voice, shared_cancel),
+        cancel,
+    )
+
+
+def _edge_synthesize_once(text: str, voice: str, cancel: threading.Event | None = None) -> bytes | None:
+    start = time.monotonic()
+    future = loop_service.submit(_edge_synthesize_async(text, voice))
+    try:
+        while True:
+            try:
+                audio = future.result(timeout=0.1)
+                break
+            except FutureTimeout:
+                if cancel is not None and cancel.is_set():
+                    future.cancel()
+                    return None
+                if time.monotonic() - start > EDGE_TIMEOUT_S:
+                    future.cancel()
+                    raise TimeoutError(f"no audio within {EDGE_TIMEOUT_S}s") from None
+        if audio:
+            latency_stats.record("edge.total", time.monotonic() - start)
+            logger.info("Edge TTS: %d bytes, voice=%s", len(audio), voice)
+            return audio
+    except Exception as exc:
+        logger.warning("Edge TTS failed for voice %s: %s", voice, exc)
     return None
 
 
@@ -94,12 +211,28 @@ def edge_synthesize(text: str, voice: str) -> bytes | None:
 
 ELEVENLABS_API = "https://api.elevenlabs.io/v1"
 VOICE_CACHE = Path("config/voice_ids.json")
+ELEVEN_VOICE_SETTINGS = {
+    "stability": 0.60,
+    "similarity_boost": 0.85,
+    "style": 0.25,
+    "speed": 0.85,
+}
+
+
+def _secret(name: str) -> str:
+    """st.secrets value, or "" — also outside a Streamlit run with no secrets file (CLI)."""
+    try:
+        if name in st.secrets:
+            return str(st.secrets[name])
+    except Exception:
+        pass
+    return ""
 
 
 def _eleven_key() -> str:
     key = os.environ.get("ELEVENLABS_API_KEY", "")
-    if not key and "ELEVENLABS_API_KEY" in st.secrets:
-        key = st.secrets["ELEVENLABS_API_KEY"]
+    if not key:
+        key = _secret("ELEVENLABS_API_KEY")
     return key
 
 
@@ -136,7 +269,7 @@ def clone_voice(leader_id: str, name: str, sample_path: str) -> str | None:
         return None
     try:
         with open(p, "rb") as f:
-            resp = requests.post(
+            resp = http_sessions.session("elevenlabs").post(
                 f"{ELEVENLABS_API}/voices/add",
                 headers=_eleven_headers(),
                 data={"name": f"EXL-{name}", "description": f"Cloned voice for {name}"},
@@ -160,23 +293,41 @@ def eleven_synthesize(
     text: str,
     voice_id: str,
     model: str = "eleven_flash_v2_5",
+    first_byte: threading.Event | None = None,
+    cancel: threading.Event | None = None,
 ) -> bytes | None:
-    """TTS via ElevenLabs. Returns MP3 bytes or None."""
+    """TTS via ElevenLabs. Returns MP3 bytes or None.
+
+    Results are served from the shared on-disk audio cache when the same
+    text was already spoken with the same voice, model and settings.
+    ``first_byte`` is set once audio starts arriving; setting ``cancel``
+    drops the download and returns None.
+    """
     if not elevenlabs_available():
         return None
+    return audio_cache.cached_synthesize(
+        "elevenlabs", voice_id, text[:2500], {"model": model, **ELEVEN_VOICE_SETTINGS},
+        lambda shared_cancel: _eleven_synthesize_once(text, voice_id, model, first_byte, shared_cancel),
+        cancel,
+    )
+
+
+def _eleven_synthesize_once(
+    text: str,
+    voice_id: str,
+    model: str,
+    first_byte: threading.Event | None = None,
+    cancel: threading.Event | None = None,
+) -> bytes | None:
+    start = time.monotonic()
     try:
-        resp = requests.post(
+        resp = http_sessions.session("elevenlabs").post(
             f"{ELEVENLABS_API}/text-to-speech/{voice_id}",
             headers={**_eleven_headers(), "Content-Type": "application/json"},
             json={
                 "text": text[:2500],
                 "model_id": model,
-                "voice_settings": {
-                    "stability": 0.60,
-                    "similarity_boost": 0.85,
-                    "style": 0.25,
-                    "speed": 0.85,
-                },
+                "voice_settings": ELEVEN_VOICE_SETTINGS,
             },
             timeout=30,
             stream=True,
@@ -184,8 +335,17 @@ def eleven_synthesize(
         resp.raise_for_status()
         buf = io.BytesIO()
         for chunk in resp.iter_content(chunk_size=4096):
+            if cancel is not None and cancel.is_set():
+                resp.close()
+                logger.info("ElevenLabs: cancelled after %d bytes, voice=%s", buf.tell(), voice_id)
+                return None
+            if not buf.tell() and chunk:
+                latency_stats.record("elevenlabs.first_byte", time.monotonic() - start)
+                if first_byte is not None:
+                    first_byte.set()
             buf.write(chunk)
         audio = buf.getvalue()
+        latency_stats.record("elevenlabs.total", time.monotonic() - start)
         logger.info("ElevenLabs: %d bytes, voice=%s", len(audio), voice_id)
         return audio
     except Exception as exc:
@@ -193,6 +353,52 @@ def eleven_synthesize(
         return None
 
 
+def eleven_stream(
+    text: str,
+    voice_id: str,
+    model: str = "eleven_flash_v2_5",
+) -> Iterator[bytes]:
+    """TTS via ElevenLabs' streaming endpoint, yielding MP3 chunks as they arrive.
+
+    A cached clip is yielded as a single chunk. The complete clip is added to
+    the audio cache once the stream ends; closing the generator early drops
+    the connection and caches nothing. HTTP errors are raised.
+    """
+    settings = {"model": model, **ELEVEN_VOICE_SETTINGS}
+    key = audio_cache.cache_key("elevenlabs", voice_id, text[:2500], settings)
+    cached = audio_cache.get(key)
+    if cached:
+        yield cached
+        return
+    start = time.monotonic()
+    resp = http_sessions.session("elevenlabs").post(
+        f"{ELEVENLABS_API}/text-to-speech/{voice_id}/stream",
+        headers={**_eleven_headers(), "Content-Type": "application/json"},
+        json={
+            "text": text[:2500],
+            "model_id": model,
+            "voice_settings": ELEVEN_VOICE_SETTINGS,
+        },
+        timeout=30,
+        stream=True,
+    )
+    buf = io.BytesIO()
+    try:
+        resp.raise_for_status()
+        for chunk in resp.iter_content(chunk_size=4096):
+            if not chunk:
+                continue
+            if not buf.tell():
+                latency_stats.record("elevenlabs.first_byte", time.monotonic() - start)
+            buf.write(chunk)
+            yield chunk
+    finally:
+        resp.close()
+    latency_stats.record("elevenlabs.total", time.monotonic() - start)
+    logger.info("ElevenLabs stream: %d bytes, voice=%s", buf.tell(), voice_id)
+    audio_cache.put(key, buf.getvalue())
+
+
 def _ensure_eleven_voice(leader_config: dict) -> str | None:
     # Priority: explicit eleven_voice_id in YAML → cached clone → clone from sample
     explicit = leader_config.get("eleven_voice_id", "")
@@ -214,35 +420,121 @@ def _ensure_eleven_voice(leader_config: dict) -> str | None:
 # Unified API  — caller uses these two functions
 # ═══════════════════════════════════════════════════════════════════════════
 
-def synthesize_for_leader(leader_config: dict, text: str) -> bytes | None:
+class VoicePlan:
+    """The provider one reply is spoken with, decided by its first sentence.
+
+    Later sentences ``wait`` for the decision and use that provider without
+    hedging, so a reply doesn't switch voice midway; they only fall back if
+    it fails outright.
+    """
+
+    WAIT_S = EDGE_TIMEOUT_S
+
+    def __init__(self):
+        self.provider: str | None = None  # "elevenlabs" | "edge"
+        self._decided = threading.Event()
+
+    def decide(self, provider: str) -> None:
+        if self.provider is None:
+            self.provider = provider
+            self._decided.set()
+
+    def release(self) -> None:
+        """Let waiting sentences go ahead (and hedge) if the first one produced nothing."""
+        self._decided.set()
+
+    def wait(self, timeout: float = WAIT_S) -> str | None:
+        self._decided.wait(timeout)
+        return self.provider
+
+
+def synthesize_for_leader(
+    leader_config: dict,
+    text: str,
+    hedge: bool = True,
+    plan: VoicePlan | None = None,
+) -> bytes | None:
     """Generate TTS audio for a leader's reply.
 
     Tries ElevenLabs (cloned voice) first, then Edge TTS (free neural voice).
+    When ElevenLabs is slow to start, Edge is raced against it unless
+    ``hedge`` is False or ``plan`` has already picked the reply's provider.
     Returns MP3 bytes or None (caller should fall back to browser TTS).
     """
     clean_text = (text or "").strip()
     if not clean_text:
         return None
+    edge_voice = leader_config.get("voice_id", "")
+    planned = plan.provider if plan else None
 
     # Tier 1: ElevenLabs cloned voice
-    if elevenlabs_available():
+    if elevenlabs_available() and planned != "edge":
         vid = _ensure_eleven_voice(leader_config)
+        if vid and edge_voice and hedge and HEDGE_ENABLED and planned is None:
+            audio, provider = _hedged_synthesize(clean_text, vid, edge_voice)
+            if audio and plan:
+                plan.decide(provider)
+            return audio
         if vid:
             audio = eleven_synthesize(clean_text, vid)
             if audio:
+                if plan:
+                    plan.decide("elevenlabs")
                 return audio
 
     # Tier 2: Edge TTS (free)
-    edge_voice = leader_config.get("voice_id", "")
     if edge_voice:
         audio = edge_synthesize(clean_text, edge_voice)
         if audio:
+            if plan:
+                plan.decide("edge")
             return audio
 
     # Tier 3: None → JS speechSynthesis fallback in browser
     return None
 
 
+def stream_for_leader(leader_config: dict, text: str) -> Iterator[bytes] | None:
+    """ElevenLabs audio for a leader's reply as a chunk generator.
+
+    Returns None when the cloned voice isn't usable; callers then use
+    ``synthesize_for_leader`` (Edge TTS), which has nothing to stream.
+    """
+    clean_text = (text or "").strip()
+    if not clean_text or not elevenlabs_available():
+        return None
+    vid = _ensure_eleven_voice(leader_config)
+    return eleven_stream(clean_text, vid) if vid else None
+
+
+def _hedged_synthesize(text: str, eleven_voice: str, edge_voice: str) -> tuple[bytes | None, str]:
+    """(audio, provider that produced it)."""
+    first_byte, cancel_eleven, cancel_edge = threading.Event(), threading.Event(), threading.Event()
+    eleven = _provider_pool.submit(eleven_synthesize, text, eleven_voice, first_byte=first_byte, cancel=cancel_eleven)
+    eleven.add_done_callback(lambda _: first_byte.set())  # cache hits and failures never stream
+
+    deadline = hedge_deadline("elevenlabs.first_byte")
+    if first_byte.wait(deadline):
+        audio = eleven.result()
+        if audio:
+            return audio, "elevenlabs"
+        return edge_synthesize(text, edge_voice), "edge"
+
+    logger.info("ElevenLabs: no first byte after %.2fs; hedging with Edge TTS", deadline)
+    _count("hedged")
+    edge = _provider_pool.submit(edge_synthesize, text, edge_voice, cancel_edge)
+    pending = {eleven, edge}
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            audio = future.result()
+            if audio:
+                (cancel_edge if future is eleven else cancel_eleven).set()
+                _count("primary_won" if future is eleven else "hedge_won")
+                return audio, "elevenlabs" if future is eleven else "edge"
+    return None, "edge"
+
+
 USER_VOICE = "en-US-ChristopherNeural"
 
 
@@ -264,8 +556,8 @@ def synthesize_user_text(text: str) -> bytes | None:
 
 def _fal_key() -> str:
     key = os.environ.get("FAL_KEY", "")
-    if not key and "FAL_KEY" in st.secrets:
-        key = st.secrets["FAL_KEY"]
+    if not key:
+        key = _secret("FAL_KEY")
     return key
 
 
@@ -278,10 +570,10 @@ def _did_key() -> str:
     key = os.environ.get("D_ID_API_KEY", "")
     if not key:
         key = os.environ.get("DID_API_KEY", "")
-    if not key and "D_ID_API_KEY" in st.secrets:
-        key = st.secrets["D_ID_API_KEY"]
-    if not key and "DID_API_KEY" in st.secrets:
-        key = st.secrets["DID_API_KEY"]
+    if not key:
+        key = _secret("D_ID_API_KEY")
+    if not key:
+        key = _secret("DID_API_KEY")
     return key
 
 
@@ -294,7 +586,7 @@ def _did_auth() -> tuple[str, str]:
     return (_did_key(), "")
 
 
-def _did_upload_image(image_path: str) -> str | None:
+def _did_upload_image(image_path: str, rejected: str | None = None) -> str | None:
     if not Path(image_path).exists():
         logger.warning("D-ID image upload skipped: image not found at %s", image_path)
         return None
@@ -303,23 +595,28 @@ def _did_upload_image(image_path: str) -> str | None:
         logger.warning("D-ID image upload skipped: unsupported image type %s", ext)
         return None
     mime = "image/jpeg" if ext in {".jpg", ".jpeg"} else "image/png"
-    with open(image_path, "rb") as f:
-        files = {"image": (Path(image_path).name, f, mime)}
-        resp = requests.post(
-            "https://api.d-id.com/images",
-            files=files,
-            auth=_did_auth(),
-            timeout=60,
-        )
-    resp.raise_for_status()
-    return resp.json().get("url")
+
+    def _upload() -> str | None:
+        with open(image_path, "rb") as f:
+            files = {"image": (Path(image_path).name, f, mime)}
+            resp = http_sessions.session("did").post(
+                "https://api.d-id.com/images",
+                files=files,
+                auth=_did_auth(),
+                timeout=60,
+            )
+        resp.raise_for_status()
+        return resp.json().get("url")
+
+    # The leader image never changes: upload it once per hosted-URL lifetime.
+    return upload_registry.get_or_upload("did", image_path, _upload, rejected=rejected)
 
 
 def _did_upload_audio(audio_bytes: bytes) -> str | None:
     if not audio_bytes:
         return None
     files = {"audio": ("audio.mp3", audio_bytes, "audio/mpeg")}
-    resp = requests.post(
+    resp = http_sessions.session("did").post(
         "https://api.d-id.com/audios",
         files=files,
         auth=_did_auth(),
@@ -334,7 +631,7 @@ def _did_create_talk(image_url: str, audio_url: str) -> str | None:
         "source_url": image_url,
         "script": {"type": "audio", "audio_url": audio_url},
     }
-    resp = requests.post(
+    resp = http_sessions.session("did").post(
         "https://api.d-id.com/talks",
         json=payload,
         auth=_did_auth(),
@@ -344,28 +641,27 @@ def _did_create_talk(image_url: str, audio_url: str) -> str | None:
     return resp.json().get("id")
 
 
-def _did_poll_talk(talk_id: str, timeout_s: int = 120) -> str | None:
-    deadline = time.time() + timeout_s
-    while time.time() < deadline:
-        resp = requests.get(
-            f"https://api.d-id.com/talks/{talk_id}",
-            auth=_did_auth(),
-            timeout=30,
-        )
-        resp.raise_for_status()
-        data = resp.json()
-        status = data.get("status")
-        if status == "done":
-            return data.get("result_url")
-        if status in {"error", "rejected"}:
-            logger.error("D-ID talk failed: %s", data)
-            return None
-        time.sleep(1.5)
-    logger.warning("D-ID talk timed out after %ss", timeout_s)
-    return None
+def _did_poll_talk(
+    talk_id: str,
+    timeout_s: int = 120,
+    cancel: threading.Event | None = None,
+    audio_s: float | None = None,
+) -> str | None:
+    # Polled when the talk should be nearly done, not on a fixed interval.
+    return did_poller.wait_for_talk(
+        talk_id,
+        audio_s=audio_s or 0.0,
+        request_kwargs={"auth": _did_auth()},
+        timeout_s=timeout_s,
+        cancel=cancel,
+    )
 
 
-def _generate_lip_sync_did(audio_bytes: bytes, image_path: str) -> str | None:
+def _generate_lip_sync_did(
+    audio_bytes: bytes,
+    image_path: str,
+    cancel: threading.Event | None = None,
+) -> str | None:
     if not did_available():
         return None
     if not Path(image_path).exists():
@@ -378,11 +674,20 @@ def _generate_lip_sync_did(audio_bytes: bytes, image_path: str) -> str | None:
         if not image_url or not audio_url:
             return None
         logger.info("Creating D-ID talk...")
-        talk_id = _did_create_talk(image_url, audio_url)
+        try:
+            talk_id = _did_create_talk(image_url, audio_url)
+        except Exception as e:
+            if not upload_registry.is_rejection(e):
+                raise
+            logger.warning("D-ID refused image %s (%s); uploading it again", image_url, e)
+            image_url = _did_upload_image(image_path, rejected=image_url)
+            if not image_url:
+                return None
+            talk_id = _did_create_talk(image_url, audio_url)
         if not talk_id:
             return None
         logger.info("Polling D-ID talk status...")
-        return _did_poll_talk(talk_id)
+        return _did_poll_talk(talk_id, cancel=cancel, audio_s=mp3_duration_s(audio_bytes))
     except Exception as e:
         logger.error("D-ID lip-sync failed: %s", e)
         return None
@@ -390,16 +695,51 @@ def _generate_lip_sync_did(audio_bytes: bytes, image_path: str) -> str | None:
 
 def _fal_preset() -> str:
     preset = os.environ.get("FAL_PRESET", "").strip().lower()
-    if not preset and "FAL_PRESET" in st.secrets:
-        preset = str(st.secrets["FAL_PRESET"]).strip().lower()
+    if not preset:
+        preset = _secret("FAL_PRESET").strip().lower()
     if preset not in {"fast", "balanced", "quality"}:
         preset = "balanced"
     return preset
 
 
-def _generate_lip_sync_fal(audio_bytes: bytes, image_path: str) -> str | None:
+FAL_POLL_S = float(os.environ.get("FAL_POLL_S", "1.0"))
+FAL_TIMEOUT_S = float(os.environ.get("FAL_TIMEOUT_S", "300"))
+
+
+def _fal_image_url(image_path: str, rejected: str | None = None) -> str | None:
+    """Hosted URL of a leader image, uploaded to FAL storage once per hosted-URL lifetime."""
+    return upload_registry.get_or_upload(
+        "fal", image_path, lambda: fal_client.upload_file(image_path), rejected=rejected
+    )
+
+
+async def _fal_run_async(arguments: dict, cancel: threading.Event | None) -> dict | None:
+    handle = await fal_client.submit_async("fal-ai/sadtalker", arguments=arguments)
+    deadline = time.monotonic() + FAL_TIMEOUT_S
+    while True:
+        if cancel is not None and cancel.is_set():
+            logger.info("FAL.AI job %s cancelled", handle.request_id)
+            if hasattr(handle, "cancel"):
+                await handle.cancel()
+            return None
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"FAL.AI job {handle.request_id} not done after {FAL_TIMEOUT_S:.0f}s")
+        status = await handle.status()
+        if isinstance(status, fal_client.Completed):
+            return await handle.get()
+        await asyncio.sleep(FAL_POLL_S)
+
+
+def _generate_lip_sync_fal(
+    audio_bytes: bytes,
+    image_path: str,
+    cancel: threading.Event | None = None,
+) -> str | None:
     """Generate a lip-sync video using FAL.AI's SadTalker model.
 
+    The leader image is uploaded once and reused; the audio is uploaded as
+    a file. The job is submitted to FAL's queue and its status polled, so
+    setting ``cancel`` stops the poll and cancels the job upstream.
     Returns the URL of the generated video or None if failed/unavailable.
     """
     if not fal_available():
@@ -412,16 +752,8 @@ def _generate_lip_sync_fal(audio_bytes: bytes, image_path: str) -> str | None:
     try:
         os.environ["FAL_KEY"] = _fal_key()
 
-        audio_b64 = base64.b64encode(audio_bytes).decode("utf-8")
-        audio_uri = f"data:audio/mpeg;base64,{audio_b64}"
-
-        with open(image_path, "rb") as f:
-            img_b64 = base64.b64encode(f.read()).decode("utf-8")
-
-        ext = Path(image_path).suffix.lower().replace(".", "")
-        if ext == "jpg":
-            ext = "jpeg"
-        image_uri = f"data:image/{ext};base64,{img_b64}"
+        image_url = _fal_image_url(image_path)
+        audio_url = fal_client.upload(audio_bytes, "audio/mpeg")
 
         preset = _fal_preset()
         avatar_mode = os.environ.get("FAL_AVATAR_MODE", "true").strip().lower()
@@ -451,19 +783,23 @@ def _generate_lip_sync_fal(audio_bytes: bytes, image_path: str) -> str | None:
             preprocess,
         )
 
-        result = fal_client.subscribe(
-            "fal-ai/sadtalker",
-            arguments={
-                "source_image_url": image_uri,
-                "driven_audio_url": audio_uri,
-                "face_enhancer": face_enhancer,
-                "preprocess": preprocess,
-                "still_mode": still_mode,
-                "expression_scale": expression_scale,
-                "face_model_resolution": face_model_resolution,
-            },
-            with_logs=False,
-        )
+        arguments = {
+            "source_image_url": image_url,
+            "driven_audio_url": audio_url,
+            "face_enhancer": face_enhancer,
+            "preprocess": preprocess,
+            "still_mode": still_mode,
+            "expression_scale": expression_scale,
+            "face_model_resolution": face_model_resolution,
+        }
+        try:
+            result = loop_service.run(_fal_run_async(arguments, cancel), timeout=FAL_TIMEOUT_S + 30)
+        except Exception as e:
+            if not upload_registry.is_rejection(e):
+                raise
+            logger.warning("FAL.AI refused image %s (%s); uploading it again", image_url, e)
+            arguments["source_image_url"] = _fal_image_url(image_path, rejected=image_url)
+            result = loop_service.run(_fal_run_async(arguments, cancel), timeout=FAL_TIMEOUT_S + 30)
 
         if result and "video" in result:
             video_url = result["video"]["url"]
@@ -487,5 +823,11 @@ def lipsync_available() -> bool:
 
 
 def generate_lip_sync(audio_bytes: bytes, image_path: str) -> str | None:
-    """Generate a lip-sync video using FAL.AI only."""
-    return _generate_lip_sync_fal(audio_bytes, image_path)
+    """Generate a lip-sync video using FAL.AI only.
+
+    Identical concurrent requests (same audio and image) share one render.
+    """
+    return single_flight.do(
+        single_flight.key("lipsync", "fal", audio_bytes, image_path),
+        lambda: _generate_lip_sync_fal(audio_bytes, image_path),
+    )
@@ -1,14 +1,84 @@
 import hashlib
 import base64
+import io
+import re
+import threading
+from collections import OrderedDict
 from datetime import datetime
 from pathlib import Path
+from typing import Callable
 
+# Encoded images are reused across reruns and sessions until the file's
+# mtime changes; least-recently-used entries go once the cap is reached.
+IMAGE_CACHE_MAX_BYTES = 64 * 1024 * 1024
 
-def get_image_base64(image_path: str) -> str:
+_image_cache: OrderedDict = OrderedDict()
+_image_cache_bytes = 0
+_image_cache_lock = threading.Lock()
+
+
+def _cached_image(key: tuple, image_path: str, build: Callable[[Path], bytes | str]):
+    global _image_cache_bytes
     p = Path(image_path)
-    if p.exists():
-        return base64.b64encode(p.read_bytes()).decode()
-    return ""
+    try:
+        mtime = p.stat().st_mtime_ns
+    except OSError:
+        return None
+    with _image_cache_lock:
+        hit = _image_cache.get(key)
+        if hit is not None and hit[0] == mtime:
+            _image_cache.move_to_end(key)
+            return hit[1]
+    value = build(p)
+    size = len(value)
+    with _image_cache_lock:
+        old = _image_cache.pop(key, None)
+        if old is not None:
+            _image_cache_bytes -= len(old[1])
+        _image_cache[key] = (mtime, value)
+        _image_cache_bytes += size
+        while _image_cache_bytes > IMAGE_CACHE_MAX_BYTES and len(_image_cache) > 1:
+            _, (_, evicted) = _image_cache.popitem(last=False)
+            _image_cache_bytes -= len(evicted)
+    return value
+
+
+def get_image_base64(image_path: str) -> str:
+    if not image_path:
+        return ""
+    b64 = _cached_image(
+        ("b64", image_path), image_path,
+        lambda p: base64.b64encode(p.read_bytes()).decode(),
+    )
+    return b64 or ""
+
+
+def _build_webp_variant(p: Path, size: int) -> bytes:
+    from PIL import Image
+
+    with Image.open(p) as img:
+        img = img.convert("RGBA" if img.mode in ("RGBA", "LA", "P") else "RGB")
+        img.thumbnail((size, size), Image.LANCZOS)
+        out = io.BytesIO()
+        img.save(out, format="WEBP", quality=85, method=4)
+    return out.getvalue()
+
+
+def get_image_variant(image_path: str, size: int) -> bytes | None:
+    """WebP copy of an image downscaled to fit ``size`` x ``size`` pixels.
+
+    Avatars are 1–1.4 MB PNGs shown at 100–220 px; callers pass the
+    display size times the device pixel ratio they want to cover.
+    """
+    if not image_path:
+        return None
+    try:
+        return _cached_image(
+            ("webp", image_path, size), image_path,
+            lambda p: _build_webp_variant(p, size),
+        )
+    except Exception:
+        return None
 
 
 def hex_to_rgba(hex_color: str, alpha: float) -> str:
@@ -162,3 +232,52 @@ def get_suggested_questions(category: str = "general") -> list[str]:
 
 def get_scenarios() -> list[dict]:
     return SCENARIOS
+
+
+def clean_tts_text(text: str) -> str:
+    """Strip markdown/special characters for clean TTS."""
+    if not text:
+        return ""
+    t = text
+    # Remove code blocks and inline code
+    t = re.sub(r"```[\s\S]*?```", " ", t)
+    t = re.sub(r"`([^`]*)`", r"\1", t)
+    # Convert markdown links to plain text
+    t = re.sub(r"\[([^\]]+)\]\(([^)]+)\)", r"\1", t)
+    # Remove URLs
+    t = re.sub(r"https?://\S+", " ", t)
+    # Remove markdown bullets and blockquotes
+    t = re.sub(r"^\s*[-*•]\s+", "", t, flags=re.MULTILINE)
+    t = re.sub(r"^\s*>\s+", "", t, flags=re.MULTILINE)
+    # Remove common special characters used in markdown
+    t = re.sub(r"[*_~#|<>]", " ", t)
+    # Remove quotes
+    t = re.sub(r'["\']', "", t)
+    # Collapse whitespace
+    t = re.sub(r"\s+", " ", t).strip()
+    return t
+
+
+# Layer III bitrates in kbps by header index, for MPEG-1 and MPEG-2/2.5.
+_MP3_KBPS = {
+    3: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    2: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+
+
+def mp3_duration_s(data: bytes) -> float | None:
+    """Approximate playing time of a constant-bitrate MP3 from its first frame header."""
+    if not data:
+        return None
+    start = 0
+    if data[:3] == b"ID3" and len(data) > 10:
+        start = 10 + ((data[6] & 0x7F) << 21 | (data[7] & 0x7F) << 14 | (data[8] & 0x7F) << 7 | (data[9] & 0x7F))
+    for i in range(start, min(len(data) - 3, start + 4096)):
+        if data[i] != 0xFF or data[i + 1] & 0xE0 != 0xE0:
+            continue
+        version, layer, index = (data[i + 1] >> 3) & 3, (data[i + 1] >> 1) & 3, data[i + 2] >> 4
+        if layer != 1 or version == 1 or index in (0, 15):
+            continue
+        kbps = _MP3_KBPS[3 if version == 3 else 2][index]
+        return (len(data) - i) * 8 / (kbps * 1000)
+    return None